@@ -0,0 +1,190 @@
+"""
+Proyecto 2 - Validación masiva de corpus
+Teoría de la Computación
+Valida archivos de oraciones (una por línea) con CYK usando el archivo
+mapeado en memoria y varios procesos trabajando sobre rangos de bytes.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from multiprocessing import Pool
+from typing import Iterator, List, Optional, Tuple
+
+from cyk_parser import CYKParser
+
+
+# Registro compacto por línea: offset (uint64), aceptada (uint8), tiempo en µs (float32)
+RECORD = struct.Struct('<QBf')
+
+
+def split_ranges(filename: str, workers: int) -> List[Tuple[int, int]]:
+    """
+    Divide el archivo en `workers` rangos de bytes [inicio, fin) alineados a
+    saltos de línea, de modo que ninguna línea quede partida entre dos rangos.
+    """
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = []
+        start = 0
+        for w in range(1, workers + 1):
+            if start >= size:
+                break
+            target = max(start, size * w // workers)
+            if w == workers or target >= size:
+                end = size
+            else:
+                newline = mm.find(b'\n', target)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+
+def _byte_terminals(parser: CYKParser) -> dict:
+    """
+    Índice bytes -> terminal para buscar tokens sin decodificar cada línea.
+    """
+    return {terminal.encode('utf-8'): terminal for terminal in parser.terminal_rules}
+
+
+def validate_range(parser: CYKParser, filename: str, start: int, end: int, shard_file: str) -> Tuple[int, int]:
+    """
+    Valida las líneas de [start, end) tokenizando directamente desde el
+    buffer mapeado y escribe un registro RECORD por línea en `shard_file`.
+
+    Retorna: (líneas procesadas, líneas aceptadas)
+    """
+    terminals = _byte_terminals(parser)
+    recognize = parser.recognize
+    pack = RECORD.pack
+    clock = time.perf_counter
+
+    lines = 0
+    accepted_lines = 0
+
+    with open(filename, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            open(shard_file, 'wb', buffering=1 << 20) as out:
+        pos = start
+        while pos < end:
+            newline = mm.find(b'\n', pos, end)
+            line_end = end if newline == -1 else newline
+
+            t0 = clock()
+            words = []
+            for token in mm[pos:line_end].split():
+                word = terminals.get(token)
+                if word is None:
+                    # Solo se decodifica si el token no coincide tal cual
+                    word = token.decode('utf-8', errors='replace').lower()
+                    if word not in parser.terminal_rules:
+                        words = None
+                        break
+                words.append(word)
+            accepted = bool(words) and recognize(words)
+            elapsed = clock() - t0
+
+            out.write(pack(pos, accepted, elapsed * 1e6))
+            lines += 1
+            accepted_lines += accepted
+            pos = line_end + 1
+
+    return lines, accepted_lines
+
+
+def _worker(args) -> Tuple[int, int]:
+    return validate_range(*args)
+
+
+def read_results(shard_file: str) -> Iterator[Tuple[int, bool, float]]:
+    """
+    Itera los registros (offset, aceptada, tiempo en µs) de un archivo de resultados.
+    """
+    with open(shard_file, 'rb') as f:
+        data = f.read()
+    for offset, accepted, micros in RECORD.iter_unpack(data):
+        yield offset, bool(accepted), micros
+
+
+def merge_results(shard_files: List[str], output_file: str) -> int:
+    """
+    Une los resultados parciales en un único archivo ordenado por offset.
+    Como cada fragmento cubre un rango contiguo y se escribe en orden, basta
+    con concatenarlos en el orden de los rangos.
+    """
+    count = 0
+    with open(output_file, 'w', encoding='utf-8') as out:
+        out.write("linea\toffset\taceptada\ttiempo_us\n")
+        for shard in shard_files:
+            for offset, accepted, micros in read_results(shard):
+                count += 1
+                out.write(f"{count}\t{offset}\t{int(accepted)}\t{micros:.2f}\n")
+    return count
+
+
+def validate_corpus(parser: CYKParser, input_file: str, output_file: str,
+                    workers: Optional[int] = None, keep_shards: bool = False) -> dict:
+    """
+    Valida un corpus completo: divide el archivo en rangos alineados a línea,
+    procesa cada rango en un proceso independiente y une los resultados.
+
+    Retorna: dict con líneas, aceptadas, fragmentos y tiempo total
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.time()
+
+    ranges = split_ranges(input_file, workers)
+    shard_files = [f"{output_file}.part{i}" for i in range(len(ranges))]
+    tasks = [
+        (parser, input_file, start, end, shard)
+        for (start, end), shard in zip(ranges, shard_files)
+    ]
+
+    if len(tasks) > 1:
+        with Pool(processes=len(tasks)) as pool:
+            counts = pool.map(_worker, tasks)
+    else:
+        counts = [_worker(task) for task in tasks]
+
+    merge_results(shard_files, output_file)
+    if not keep_shards:
+        for shard in shard_files:
+            os.remove(shard)
+
+    return {
+        'lines': sum(c[0] for c in counts),
+        'accepted': sum(c[1] for c in counts),
+        'shards': len(tasks),
+        'elapsed': time.time() - start_time
+    }
+
+
+def main():
+    """
+    Uso: python corpus_validator.py gramatica_cnf.txt corpus.txt resultados.tsv [-w N]
+    """
+    arg_parser = argparse.ArgumentParser(description="Validación masiva de oraciones con CYK")
+    arg_parser.add_argument('grammar', help="Gramática en CNF")
+    arg_parser.add_argument('corpus', help="Archivo con una oración por línea")
+    arg_parser.add_argument('output', help="Archivo de resultados (TSV)")
+    arg_parser.add_argument('-w', '--workers', type=int, default=None, help="Número de procesos")
+    args = arg_parser.parse_args()
+
+    parser = CYKParser()
+    if not parser.load_cnf_grammar(args.grammar):
+        return
+
+    summary = validate_corpus(parser, args.corpus, args.output, args.workers)
+    print(f"✓ {summary['lines']} líneas ({summary['accepted']} aceptadas) "
+          f"en {summary['elapsed']:.2f} s con {summary['shards']} procesos")
+    print(f"  Resultados en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,530 @@ Teoría de la Computación
 Implementación del algoritmo CYK para parsing de gramáticas CFG
 """
 
+import json
+import logging
 import os
 import re
 import time
 from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple
+from types import MappingProxyType
+from typing import IO, Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+STAGE_NAMES = {
+    1: "Eliminando producciones-ε",
+    2: "Eliminando producciones unitarias",
+    3: "Eliminando símbolos inútiles",
+    4: "Convirtiendo a Forma Normal de Chomsky",
+    5: "Guardando gramática en CNF",
+}
+
+
+def format_grammar(productions: Dict[str, List[str]], title: str = "GRAMÁTICA") -> str:
+    """
+    Da formato de tabla a una gramática (usado por display_grammar y por la consola).
+    """
+    lines = [f"\n{'='*60}", f"{title:^60}", '='*60]
+    for nt in sorted(productions.keys()):
+        prods = " | ".join(productions[nt])
+        lines.append(f"{nt} → {prods}")
+    lines.append('='*60)
+    return "\n".join(lines)
+
+
+def write_tree_dot(tree: Optional[dict], f: IO[str]):
+    """
+    Escribe el árbol en formato DOT (Graphviz) nodo por nodo, en preorden.
+    """
+    f.write("digraph ParseTree {\n")
+    f.write("  rankdir=TB;\n")
+    f.write("  node [fontname=\"Arial\"];\n")
+    count = 0
+    stack = [(tree, None)]
+    while stack:
+        node, parent_id = stack.pop()
+        if node is None:
+            continue
+        count += 1
+        node_id = f"n{count}"
+        symbol = node['symbol'].replace('"', '\\"')
+        if node['type'] == 'terminal':
+            value = node['value'].replace('"', '\\"')
+            f.write(f'  {node_id} [label="{symbol}\\n\'{value}\'", shape=box];\n')
+        else:
+            f.write(f'  {node_id} [label="{symbol}", shape=ellipse];\n')
+        if parent_id:
+            f.write(f'  {parent_id} -> {node_id};\n')
+        if node['type'] == 'nonterminal':
+            stack.extend((child, node_id) for child in reversed(node['children']))
+    f.write("}\n")
+
+
+def _bracket_label(text: str) -> str:
+    """
+    Escapa los paréntesis como en el Penn Treebank.
+    """
+    return text.replace('(', '-LRB-').replace(')', '-RRB-')
+
+
+def write_tree_bracketed(tree: Optional[dict], f: IO[str]):
+    """
+    Escribe el árbol entre paréntesis al estilo Penn: (S (NP (Det the) ...)).
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        if isinstance(node, str):
+            f.write(node)
+        elif node['type'] == 'terminal':
+            if node['symbol'] == node['value']:
+                # Palabra escaneada directamente (árboles de Earley)
+                f.write(_bracket_label(node['value']))
+            else:
+                f.write(f"({_bracket_label(node['symbol'])} {_bracket_label(node['value'])})")
+        else:
+            f.write(f"({_bracket_label(node['symbol'])}")
+            stack.append(')')
+            for child in reversed(node['children']):
+                stack.append(child)
+                stack.append(' ')
+    f.write("\n")
+
+
+def write_tree_json(tree: Optional[dict], f: IO[str]):
+    """
+    Escribe el árbol como JSON (mismo resultado que json.dump) sin recursión.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            f.write(node)
+            continue
+        if node is None:
+            f.write('null')
+            continue
+        pieces = ['{']
+        for index, (key, value) in enumerate(node.items()):
+            if index:
+                pieces.append(', ')
+            pieces.append(json.dumps(key) + ': ')
+            if key == 'children':
+                pieces.append('[')
+                for position, child in enumerate(value):
+                    if position:
+                        pieces.append(', ')
+                    # Hijos vacíos se escriben como null, igual que json.dump
+                    pieces.append(child if child is not None else 'null')
+                pieces.append(']')
+            else:
+                pieces.append(json.dumps(value))
+        pieces.append('}')
+        stack.extend(reversed(pieces))
+    f.write("\n")
+
+
+TREE_WRITERS = {
+    'dot': write_tree_dot,
+    'bracketed': write_tree_bracketed,
+    'json': write_tree_json,
+}
+
+
+class EventEmitter:
+    """
+    Despacha eventos estructurados (nombre, datos) a los oyentes registrados.
+    Sin oyentes `enabled` es False y las clases no construyen ningún evento,
+    por lo que el modo silencioso no tiene costo en los ciclos de parsing.
+    """
+
+    def __init__(self, listeners: Optional[List[Callable[[str, dict], None]]] = None):
+        self.listeners = []
+        self.enabled = False
+        for listener in listeners or []:
+            self.subscribe(listener)
+
+    def subscribe(self, listener: Callable[[str, dict], None]):
+        """
+        Registra un oyente: cualquier callable listener(evento, datos).
+        """
+        self.listeners.append(listener)
+        self.enabled = True
+        return listener
+
+    def unsubscribe(self, listener: Callable[[str, dict], None]):
+        """
+        Elimina un oyente registrado.
+        """
+        self.listeners.remove(listener)
+        self.enabled = bool(self.listeners)
+
+    def emit(self, event: str, **data):
+        """
+        Envía un evento a todos los oyentes.
+        """
+        for listener in self.listeners:
+            listener(event, data)
+
+
+class ConsoleReporter:
+    """
+    Oyente que reproduce en consola la salida clásica del programa.
+    """
+
+    def __call__(self, event: str, data: dict):
+        handler = getattr(self, 'on_' + event, None)
+        if handler is not None:
+            handler(**data)
+
+    def on_grammar_file_missing(self, filename, **_):
+        print(f"Error: El archivo {filename} no existe.")
+
+    def on_grammar_load_failed(self, error, **_):
+        print(f"Error al cargar gramática: {error}")
+
+    def on_grammar_loaded(self, nonterminals, terminals, **_):
+        print(f"✓ Gramática cargada: {nonterminals} no-terminales, {terminals} terminales")
+
+    def on_conversion_started(self, **_):
+        print("\n" + "="*60)
+        print("CONVERSIÓN A FORMA NORMAL DE CHOMSKY")
+        print("="*60)
+
+    def on_grammar_snapshot(self, title, productions, **_):
+        print(format_grammar(productions, title))
+
+    def on_stage_started(self, step, name, total=5, **_):
+        print(f"\n[{step}/{total}] {name}...")
+
+    def on_stage_finished(self, step, **data):
+        if step == 1:
+            if not data['nullable']:
+                print("  → No hay símbolos anulables")
+                return
+            print(f"  → Símbolos anulables: {sorted(data['nullable'])}")
+            print(f"  ✓ Producciones-ε eliminadas")
+        elif step == 2:
+            print(f"  ✓ Producciones unitarias eliminadas")
+        elif step == 3:
+            print(f"  ✓ Símbolos inútiles eliminados")
+        elif step == 4:
+            print(f"  ✓ Gramática convertida a CNF")
+            print(f"    - Nuevos no-terminales para terminales: {data['terminal_nonterminals']}")
+            print(f"    - Nuevos no-terminales intermedios: {data['intermediate_nonterminals']}")
+            print(f"    - Reglas optimizadas (sin duplicados)")
+        elif step == 5:
+            print(f"  ✓ Guardada en: {data['filename']}")
+
+    def on_grammar_minimized(self, symbols_before, symbols_after, rules_before, rules_after, **data):
+        print(f"\n  ✓ Gramática minimizada: {symbols_before} → {symbols_after} no-terminales, "
+              f"{rules_before} → {rules_after} reglas")
+        for representative, group in data['merged'].items():
+            print(f"    - {representative} ≡ {', '.join(group)}")
+        if 'speedup' in data:
+            print(f"    - Speedup de CYK medido: {data['speedup']:.2f}x")
+    
+    def on_grammar_patched(self, changed, rules_added, rules_removed, elapsed, **_):
+        print(f"✓ Gramática actualizada: +{rules_added}/-{rules_removed} reglas, "
+              f"{len(changed)} no-terminales cambiaron ({elapsed*1000:.2f} ms)")
+
+    def on_stage_failed(self, error, **_):
+        print(f"  ✗ Error al guardar: {error}")
+
+    def on_cnf_loaded(self, rules, **_):
+        print(f"✓ Gramática CNF cargada: {rules} reglas")
+
+    def on_cnf_load_failed(self, error, **_):
+        print(f"Error al cargar gramática CNF: {error}")
+
+    def on_parse_started(self, sentence, words, algorithm='CYK', **_):
+        print(f"\n{'='*60}")
+        print(f"ALGORITMO {algorithm} - ANÁLISIS")
+        print('='*60)
+        print(f"Oracion: {sentence}")
+        print(f"Palabras: {words}")
+
+    def on_cyk_step(self, length, **_):
+        print(f"\nPaso {length}: Subcadenas de longitud {length}")
+
+    def on_cyk_cell(self, i, j, substring, symbol, split=None, **_):
+        if split is None:
+            print(f"  [{i},{j}] '{substring}' -> {symbol}")
+        else:
+            B, C, k = split
+            print(f"  [{i},{j}] '{substring}' -> {symbol} (via {B} {C}, k={k})")
+
+    def on_earley_column(self, position, items, completed, **_):
+        print(f"  [{position}] {items} ítems, completados: {completed}")
+
+    def on_parse_finished(self, accepted, elapsed, **_):
+        print(f"\n{'='*60}")
+        print(f"RESULTADO: {'✓ ACEPTADA' if accepted else '✗ RECHAZADA'}")
+        print(f"Tiempo de ejecución: {elapsed*1000:.4f} ms")
+        print('='*60)
+
+    def on_parse_aborted(self, reason, completed_length, length, elapsed, **_):
+        print(f"\n{'='*60}")
+        print(f"RESULTADO: ⏱ PRESUPUESTO AGOTADO ({ParseBudget.REASONS[reason]})")
+        if completed_length is not None:
+            print(f"Progreso: {completed_length}/{length}")
+        print(f"Tiempo de ejecución: {elapsed*1000:.4f} ms")
+        print('='*60)
+
+    def on_grammars_checked(self, sentence, results, elapsed, **_):
+        print(f"\n'{sentence}' ({elapsed*1000:.4f} ms)")
+        for name, accepted in results.items():
+            mark = '⏱' if accepted is None else ('✓' if accepted else '✗')
+            print(f"  {mark} {name}")
+
+    def on_tree_saved(self, filename, **_):
+        print(f"✓ Árbol guardado en: {filename}")
+        print(f"  Para visualizar: dot -Tpng {filename} -o parse_tree.png")
+
+    def on_tree_save_failed(self, error, **_):
+        print(f"✗ Error al guardar árbol: {error}")
+
+
+class LoggingReporter:
+    """
+    Oyente que reenvía los eventos al módulo logging (datos en `extra`).
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger('cyk_parser')
+        self.level = level
+
+    def __call__(self, event: str, data: dict):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s %s", event, data, extra={'event': event, 'data': data})
+
+
+def make_events(silent: bool = False, events: Optional[EventEmitter] = None) -> EventEmitter:
+    """
+    Emisor por defecto de las clases: consola, o ninguno en modo silencioso.
+    """
+    if events is not None:
+        return events
+    return EventEmitter([] if silent else [ConsoleReporter()])
+
+
+class CancellationToken:
+    """
+    Permite abortar un parse en curso desde otro hilo o tarea asíncrona
+    (p. ej. un parse ejecutado con run_in_executor cuyo request expiró).
+    """
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Solicita la cancelación; el parse se detiene en su siguiente revisión.
+        """
+        self.cancelled = True
+
+
+class ParseBudget:
+    """
+    Límites de trabajo de un parse: tiempo (timeout relativo en segundos o
+    deadline absoluto de time.monotonic()), celdas, aplicaciones de reglas y
+    un token de cancelación opcional.
+
+    El reloj empieza al entrar al parse y la primera revisión ocurre antes de
+    crear la tabla (rechaza de entrada si las n celdas de la diagonal ya
+    exceden max_cells). Después se revisa solo entre longitudes de subcadena
+    (entre columnas en Earley y cada cierto número de entradas de la agenda en
+    parse_sparse), por lo que no agrega costo por celda; como la tabla se crea
+    a medida que se llena, un parse abortado solo gasta memoria y tiempo en lo
+    que el presupuesto permitió. En CYKParser.parse max_cells nunca se supera;
+    el tiempo y max_rules pueden excederse a lo sumo en una longitud.
+    """
+
+    REASONS = {
+        'cancelled': "cancelado",
+        'deadline': "tiempo límite",
+        'cells': "máximo de celdas",
+        'rules': "máximo de aplicaciones de reglas",
+    }
+
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None,
+                 max_cells: Optional[int] = None, max_rules: Optional[int] = None,
+                 token: Optional[CancellationToken] = None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_cells = max_cells
+        self.max_rules = max_rules
+        self.token = token
+
+    def start(self) -> Optional[float]:
+        """
+        Límite de tiempo efectivo (time.monotonic()) para un parse que empieza ahora.
+        """
+        limit = self.deadline
+        if self.timeout is not None:
+            limit = time.monotonic() + self.timeout if limit is None else min(limit, time.monotonic() + self.timeout)
+        return limit
+
+    def exceeded(self, limit: Optional[float], cells: int, rules: int) -> Optional[str]:
+        """
+        Motivo por el que el parse debe detenerse, o None para continuar.
+        cells es el total de celdas incluyendo las del siguiente paso.
+        """
+        if self.token is not None and self.token.cancelled:
+            return 'cancelled'
+        if limit is not None and time.monotonic() >= limit:
+            return 'deadline'
+        if self.max_cells is not None and cells > self.max_cells:
+            return 'cells'
+        if self.max_rules is not None and rules > self.max_rules:
+            return 'rules'
+        return None
+
+
+class SymbolTable:
+    """
+    Interna los nombres de símbolos: cada nombre recibe un ID entero estable.
+    """
+    
+    def __init__(self):
+        self.ids = {}  # Dict[str, int]
+        self.names = []  # List[str] - ID -> nombre
+    
+    def intern(self, name: str) -> int:
+        """
+        Retorna el ID del símbolo, asignándole uno nuevo si no existía.
+        """
+        sid = self.ids.get(name)
+        if sid is None:
+            sid = len(self.names)
+            self.ids[name] = sid
+            self.names.append(name)
+        return sid
+    
+    def render(self, prod: Tuple[int, ...]) -> str:
+        """
+        Convierte una producción (tupla de IDs) a texto; () es ε.
+        """
+        if not prod:
+            return 'ε'
+        names = self.names
+        return ' '.join(names[s] for s in prod)
+    
+    def copy(self) -> 'SymbolTable':
+        table = SymbolTable()
+        table.ids = dict(self.ids)
+        table.names = list(self.names)
+        return table
+
+
+def equivalent_nonterminals(rules: Dict[Hashable, Iterable[tuple]],
+                            encode: Callable[[Hashable], Hashable],
+                            preference: Callable[[Hashable], Any]) -> Tuple[Dict[Hashable, int], Dict[Hashable, Hashable]]:
+    """
+    Agrupa los no-terminales equivalentes de una gramática en CNF.
+
+    Refinamiento de particiones (estilo bisimulación): se parte de un único
+    bloque y se separan los no-terminales cuyas producciones, vistas a través
+    de los bloques actuales, difieren; al llegar al punto fijo cada bloque
+    genera el mismo lenguaje. `encode` codifica los símbolos que no son
+    no-terminales (sin chocar con los números de bloque, que son enteros >= 0)
+    y el representante de cada bloque es el miembro con menor `preference`.
+
+    Retorna: (bloque de cada no-terminal, representante de cada no-terminal)
+    """
+    block = {nt: 0 for nt in rules}
+    num_blocks = 1
+    while True:
+        signatures = {}
+        new_block = {}
+        for nt, prods in rules.items():
+            signature = (block[nt], frozenset(
+                tuple(block[s] if s in block else encode(s) for s in prod) for prod in prods
+            ))
+            new_block[nt] = signatures.setdefault(signature, len(signatures))
+        block = new_block
+        if len(signatures) == num_blocks:
+            break
+        num_blocks = len(signatures)
+
+    members = defaultdict(list)
+    for nt in rules:
+        members[block[nt]].append(nt)
+    representatives = {}
+    for group in members.values():
+        representative = min(group, key=preference)
+        for nt in group:
+            representatives[nt] = representative
+    return block, representatives
 
 
 class CNFConverter:
     """
     Convierte una gramática CFG a Forma Normal de Chomsky (CNF).
     Incluye eliminación de ε-producciones, producciones unitarias, y símbolos inútiles.
+    
+    Internamente los símbolos son IDs enteros (SymbolTable), cada producción es
+    una tupla de IDs (ε = tupla vacía) y cada lado izquierdo guarda sus
+    producciones en un dict usado como conjunto ordenado por inserción. El texto
+    solo se genera al mostrar o guardar la gramática (propiedad `productions`).
     """
     
-    def __init__(self):
-        self.productions = {}  # Dict[str, List[str]]
-        self.non_terminals = set()
-        self.terminals = set()
+    def __init__(self, silent: bool = False, events: Optional[EventEmitter] = None):
+        self.symbols = SymbolTable()
+        self.rules = {}  # Dict[int, Dict[Tuple[int, ...], None]]
+        self.nonterminal_ids = set()
+        self.terminal_ids = set()
         self.start_symbol = 'S'
-        
+        self.events = make_events(silent, events)
+        # Resultado de minimize_cnf: representante -> no-terminales fusionados
+        self.merged_symbols = {}  # Dict[str, List[str]]
+        self.symbol_map = {}  # Dict[str, str] - no-terminal -> representante
+        self.unminimized_rules = {}  # Dict[int, Dict[Tuple[int, ...], None]] - CNF antes de minimizar
+    
+    @property
+    def productions(self) -> Dict[str, List[str]]:
+        """
+        Vista en texto de la gramática: no-terminal -> lista de producciones.
+        """
+        render = self.symbols.render
+        names = self.symbols.names
+        return {names[nt]: [render(prod) for prod in prods] for nt, prods in self.rules.items()}
+    
+    @productions.setter
+    def productions(self, productions: Dict[str, List[str]]):
+        intern = self.symbols.intern
+        self.rules = {
+            intern(nt): {
+                () if prod in ['ε', 'e', ''] else tuple(intern(s) for s in prod.split()): None
+                for prod in prods
+            }
+            for nt, prods in productions.items()
+        }
+    
+    @property
+    def non_terminals(self) -> Set[str]:
+        names = self.symbols.names
+        return {names[s] for s in self.nonterminal_ids}
+    
+    @property
+    def terminals(self) -> Set[str]:
+        names = self.symbols.names
+        return {names[s] for s in self.terminal_ids}
+    
+    def copy(self, silent: bool = True) -> 'CNFConverter':
+        """
+        Copia independiente de la gramática (por defecto sin salida en consola).
+        """
+        other = CNFConverter(silent=silent)
+        other.symbols = self.symbols.copy()
+        other.rules = {nt: dict(prods) for nt, prods in self.rules.items()}
+        other.nonterminal_ids = set(self.nonterminal_ids)
+        other.terminal_ids = set(self.terminal_ids)
+        other.start_symbol = self.start_symbol
+        return other
+    
     def parse_grammar_line(self, line: str) -> Tuple[str, List[str]]:
         """
         Parsea una línea de gramática.
@@ -73,7 +578,7 @@ class CNFConverter:
             if prod[i].isspace():
                 i += 1
                 continue
-            
+        
             # No-terminal (empieza con mayúscula, puede tener minúsculas: S, NP, VP, Det)
             if prod[i].isupper():
                 j = i + 1
@@ -82,7 +587,7 @@ class CNFConverter:
                     j += 1
                 symbols.append(prod[i:j])
                 i = j
-            
+        
             # Terminal multi-carácter (palabra minúscula como 'id', 'num', 'he', 'cat')
             elif prod[i].islower():
                 j = i
@@ -90,7 +595,7 @@ class CNFConverter:
                     j += 1
                 symbols.append(prod[i:j])
                 i = j
-            
+        
             # Símbolo especial (+, *, (, ), etc.)
             else:
                 symbols.append(prod[i])
@@ -102,397 +607,674 @@ class CNFConverter:
         """
         Carga una gramática desde un archivo.
         """
+        start_time = time.perf_counter()
         try:
             if not os.path.exists(filename):
-                print(f"Error: El archivo {filename} no existe.")
+                if self.events.enabled:
+                    self.events.emit('grammar_file_missing', filename=filename)
                 return False
-            
-            self.productions.clear()
-            self.non_terminals.clear()
-            self.terminals.clear()
-            
+        
+            self.symbols = SymbolTable()
+            self.rules = {}
+            self.nonterminal_ids = set()
+            self.terminal_ids = set()
+            intern = self.symbols.intern
+        
             with open(filename, 'r', encoding='utf-8') as file:
                 for line_num, line in enumerate(file, 1):
                     left, prods = self.parse_grammar_line(line)
                     if left is None:
                         continue
-                    
-                    self.non_terminals.add(left)
-                    
-                    if left not in self.productions:
-                        self.productions[left] = []
-                    
+        
+                    left_id = intern(left)
+                    self.nonterminal_ids.add(left_id)
+                    left_prods = self.rules.setdefault(left_id, {})
+        
                     for prod in prods:
                         # Tokenizar la producción
                         symbols = self.tokenize_production(prod)
-                        prod_string = ' '.join(symbols)
-                        
-                        if prod_string not in self.productions[left]:
-                            self.productions[left].append(prod_string)
-                        
+                        if symbols == ['ε']:
+                            left_prods[()] = None
+                            continue
+        
+                        # Conjunto ordenado: los duplicados se descartan en O(1)
+                        left_prods[tuple(intern(s) for s in symbols)] = None
+        
                         # Identificar terminales y no-terminales
                         for symbol in symbols:
                             if symbol in ['ε', 'e']:
                                 continue
                             elif len(symbol) == 1 and symbol[0].isupper():
-                                self.non_terminals.add(symbol)
+                                self.nonterminal_ids.add(intern(symbol))
                             else:
-                                self.terminals.add(symbol)
-            
+                                self.terminal_ids.add(intern(symbol))
+        
             # El símbolo inicial es el primero que aparece
-            if self.productions:
-                self.start_symbol = list(self.productions.keys())[0]
-            
-            print(f"✓ Gramática cargada: {len(self.productions)} no-terminales, {len(self.terminals)} terminales")
+            if self.rules:
+                self.start_symbol = self.symbols.names[next(iter(self.rules))]
+        
+            if self.events.enabled:
+                self.events.emit('grammar_loaded', filename=filename,
+                                 nonterminals=len(self.rules), terminals=len(self.terminal_ids),
+                                 rules=self.count_rules(), elapsed=time.perf_counter() - start_time)
             return True
-            
+        
         except Exception as e:
-            print(f"Error al cargar gramática: {e}")
+            if self.events.enabled:
+                self.events.emit('grammar_load_failed', filename=filename, error=e)
             return False
     
     def display_grammar(self, title="GRAMÁTICA"):
         """
         Muestra la gramática actual.
         """
-        print(f"\n{'='*60}")
-        print(f"{title:^60}")
-        print('='*60)
-        for nt in sorted(self.productions.keys()):
-            prods = " | ".join(self.productions[nt])
-            print(f"{nt} → {prods}")
-        print('='*60)
+        print(format_grammar(self.productions, title))
     
-    def find_nullable_symbols(self) -> Set[str]:
+    def count_rules(self) -> int:
         """
-        Encuentra símbolos anulables (que pueden derivar en ε).
+        Número total de producciones de la gramática actual.
+        """
+        return sum(len(prods) for prods in self.rules.values())
+    
+    def _stage_started(self, step: int) -> Optional[Tuple[float, int, int]]:
+        """
+        Emite el inicio de una etapa de conversión y guarda las medidas previas.
+        """
+        if not self.events.enabled:
+            return None
+        self.events.emit('stage_started', step=step, name=STAGE_NAMES[step], total=len(STAGE_NAMES))
+        return time.perf_counter(), len(self.rules), self.count_rules()
+    
+    def _stage_finished(self, step: int, before: Optional[Tuple[float, int, int]], **extra):
+        """
+        Emite el fin de una etapa con conteos antes/después y su duración.
+        """
+        if before is None:
+            return
+        start, symbols_before, rules_before = before
+        self.events.emit('stage_finished', step=step, name=STAGE_NAMES[step],
+                         symbols_before=symbols_before, rules_before=rules_before,
+                         symbols_after=len(self.rules), rules_after=self.count_rules(),
+                         elapsed=time.perf_counter() - start, **extra)
+    
+    def _nullable_ids(self) -> Set[int]:
+        """
+        IDs de los símbolos anulables (que pueden derivar en ε).
         """
         nullable = set()
         
-        # Paso 1: Símbolos con producción ε directa
-        for nt, prods in self.productions.items():
-            for prod in prods:
-                if prod == 'ε' or prod == 'e' or prod == '':
-                    nullable.add(nt)
-                    break
-        
-        # Paso 2: Símbolos que derivan solo en anulables
+        # Una producción vacía (ε) cumple trivialmente "todos sus símbolos son anulables"
         changed = True
         while changed:
             changed = False
-            for nt, prods in self.productions.items():
+            for nt, prods in self.rules.items():
                 if nt not in nullable:
                     for prod in prods:
-                        if prod != 'ε' and prod != 'e' and prod != '':
-                            symbols = prod.split()
-                            if all(s in nullable for s in symbols):
-                                nullable.add(nt)
-                                changed = True
-                                break
+                        if all(s in nullable for s in prod):
+                            nullable.add(nt)
+                            changed = True
+                            break
         
         return nullable
     
+    def find_nullable_symbols(self) -> Set[str]:
+        """
+        Encuentra símbolos anulables (que pueden derivar en ε).
+        """
+        names = self.symbols.names
+        return {names[s] for s in self._nullable_ids()}
+    
     def remove_epsilon_productions(self):
         """
         Elimina producciones-ε de la gramática.
         """
-        print("\n[1/5] Eliminando producciones-ε...")
+        stage = self._stage_started(1)
         
-        nullable = self.find_nullable_symbols()
+        nullable = self._nullable_ids()
         if not nullable:
-            print("  → No hay símbolos anulables")
+            self._stage_finished(1, stage, nullable=[])
             return
         
-        print(f"  → Símbolos anulables: {sorted(nullable)}")
-        
+        start = self.symbols.intern(self.start_symbol)
         new_grammar = {}
         
-        for nt, prods in self.productions.items():
-            new_prods = set()
-            
+        for nt, prods in self.rules.items():
+            new_prods = {}
+        
             for prod in prods:
-                if prod == 'ε' or prod == 'e' or prod == '':
+                if not prod:
                     # Si es el símbolo inicial, permitir ε
-                    if nt == self.start_symbol:
-                        new_prods.add('ε')
+                    if nt == start:
+                        new_prods[()] = None
                     continue
-                
-                symbols = prod.split()
-                
+        
                 # Generar todas las combinaciones removiendo anulables
-                nullable_positions = [i for i, s in enumerate(symbols) if s in nullable]
-                
-                # 2^n combinaciones
+                nullable_positions = [i for i, s in enumerate(prod) if s in nullable]
+        
+                # 2^n combinaciones: el bit b del mask omite la posición nullable_positions[b]
                 for mask in range(1 << len(nullable_positions)):
-                    new_prod = []
-                    for i, symbol in enumerate(symbols):
-                        if i in nullable_positions:
-                            pos_index = nullable_positions.index(i)
-                            if not (mask & (1 << pos_index)):
-                                new_prod.append(symbol)
-                        else:
-                            new_prod.append(symbol)
-                    
+                    omitted = {pos for b, pos in enumerate(nullable_positions) if mask & (1 << b)}
+                    new_prod = tuple(s for i, s in enumerate(prod) if i not in omitted)
+        
                     if new_prod:
-                        new_prods.add(' '.join(new_prod))
-                    elif nt == self.start_symbol:
-                        new_prods.add('ε')
-            
-            new_grammar[nt] = list(new_prods)
+                        new_prods[new_prod] = None
+                    elif nt == start:
+                        new_prods[()] = None
+        
+            new_grammar[nt] = new_prods
         
-        self.productions = new_grammar
-        print(f"  ✓ Producciones-ε eliminadas")
+        self.rules = new_grammar
+        names = self.symbols.names
+        self._stage_finished(1, stage, nullable=sorted(names[s] for s in nullable))
     
     def remove_unit_productions(self):
         """
         Elimina producciones unitarias (A → B).
         """
-        print("\n[2/5] Eliminando producciones unitarias...")
-        
-        # Encontrar todas las producciones unitarias
-        unit_pairs = set()
-        for nt, prods in self.productions.items():
-            for prod in prods:
-                symbols = prod.split()
-                if len(symbols) == 1 and symbols[0] in self.non_terminals:
-                    unit_pairs.add((nt, symbols[0]))
-        
-        # Clausura transitiva
-        changed = True
-        while changed:
-            changed = False
-            new_pairs = set()
-            for (a, b) in unit_pairs:
-                for (c, d) in unit_pairs:
-                    if b == c and (a, d) not in unit_pairs:
-                        new_pairs.add((a, d))
-                        changed = True
-            unit_pairs.update(new_pairs)
+        stage = self._stage_started(2)
+        nonterminal_ids = self.nonterminal_ids
+    
+        def is_unit(prod):
+            return len(prod) == 1 and prod[0] in nonterminal_ids
+        
+        # Grafo de producciones unitarias A -> [B]
+        unit_graph = {}
+        for nt, prods in self.rules.items():
+            targets = [prod[0] for prod in prods if is_unit(prod)]
+            if targets:
+                unit_graph[nt] = targets
+        
+        # Clausura transitiva: recorrido desde cada no-terminal con unitarias
+        unit_pairs = {}
+        for nt, targets in unit_graph.items():
+            reached = {}
+            pending = list(targets)
+            while pending:
+                b = pending.pop()
+                if b in reached:
+                    continue
+                reached[b] = None
+                pending.extend(unit_graph.get(b, ()))
+            unit_pairs[nt] = reached
         
         # Reemplazar producciones unitarias
         new_grammar = {}
-        for nt in self.productions.keys():
-            new_prods = set()
-            
+        for nt, prods in self.rules.items():
             # Agregar producciones no unitarias
-            for prod in self.productions[nt]:
-                symbols = prod.split()
-                if len(symbols) != 1 or symbols[0] not in self.non_terminals:
-                    new_prods.add(prod)
-            
+            new_prods = {prod: None for prod in prods if not is_unit(prod)}
+        
             # Agregar producciones derivadas de unitarias
-            for (a, b) in unit_pairs:
-                if a == nt:
-                    for prod in self.productions[b]:
-                        symbols = prod.split()
-                        if len(symbols) != 1 or symbols[0] not in self.non_terminals:
-                            new_prods.add(prod)
-            
-            new_grammar[nt] = list(new_prods)
+            for b in unit_pairs.get(nt, ()):
+                for prod in self.rules.get(b, ()):
+                    if not is_unit(prod):
+                        new_prods[prod] = None
+        
+            new_grammar[nt] = new_prods
         
-        self.productions = new_grammar
-        print(f"  ✓ Producciones unitarias eliminadas")
+        self.rules = new_grammar
+        self._stage_finished(2, stage, unit_pairs=sum(len(r) for r in unit_pairs.values()))
     
     def remove_useless_symbols(self):
         """
         Elimina símbolos inútiles (que no generan terminales o no son alcanzables).
         """
-        print("\n[3/5] Eliminando símbolos inútiles...")
+        stage = self._stage_started(3)
+        terminal_ids = self.terminal_ids
         
         # Paso 1: Encontrar símbolos generadores (que derivan en terminales)
         generating = set()
         changed = True
         while changed:
             changed = False
-            for nt, prods in self.productions.items():
+            for nt, prods in self.rules.items():
                 if nt not in generating:
                     for prod in prods:
-                        if prod == 'ε':
-                            generating.add(nt)
-                            changed = True
-                            break
-                        symbols = prod.split()
-                        if all(s in self.terminals or s in generating for s in symbols):
+                        if all(s in terminal_ids or s in generating for s in prod):
                             generating.add(nt)
                             changed = True
                             break
         
         # Paso 2: Encontrar símbolos alcanzables desde S
-        reachable = {self.start_symbol}
-        changed = True
-        while changed:
-            changed = False
-            for nt in list(reachable):
-                if nt in self.productions:
-                    for prod in self.productions[nt]:
-                        symbols = prod.split()
-                        for s in symbols:
-                            if s in self.non_terminals and s not in reachable:
-                                reachable.add(s)
-                                changed = True
+        start = self.symbols.intern(self.start_symbol)
+        reachable = {start}
+        pending = [start]
+        while pending:
+            nt = pending.pop()
+            for prod in self.rules.get(nt, ()):
+                for s in prod:
+                    if s in self.nonterminal_ids and s not in reachable:
+                        reachable.add(s)
+                        pending.append(s)
         
         # Símbolos útiles = generadores ∩ alcanzables
         useful = generating & reachable
         
         # Eliminar símbolos inútiles
         new_grammar = {}
-        for nt in useful:
-            if nt in self.productions:
-                new_prods = []
-                for prod in self.productions[nt]:
-                    symbols = prod.split()
-                    if all(s in self.terminals or s in useful for s in symbols):
-                        new_prods.append(prod)
+        for nt, prods in self.rules.items():
+            if nt in useful:
+                new_prods = {
+                    prod: None for prod in prods
+                    if prod and all(s in terminal_ids or s in useful for s in prod)
+                }
                 if new_prods:
                     new_grammar[nt] = new_prods
         
-        self.productions = new_grammar
-        self.non_terminals = useful
-        print(f"  ✓ Símbolos inútiles eliminados")
+        self.rules = new_grammar
+        self.nonterminal_ids = useful
+        self._stage_finished(3, stage, useful=len(useful))
     
     def convert_to_cnf(self):
         """
         Convierte la gramática a Forma Normal de Chomsky.
         CNF: A → BC (dos no-terminales) o A → a (un terminal)
         """
-        print("\n[4/5] Convirtiendo a Forma Normal de Chomsky...")
+        stage = self._stage_started(4)
         
         new_grammar = {}
         terminal_map = {}  # terminal -> no-terminal
         intermediate_map = {}  # producción -> no-terminal (NUEVO: para reutilizar)
         next_nt_index = [0]  # Para generar nuevos no-terminales
-        
+        start = self.symbols.intern(self.start_symbol)
+        terminal_ids = self.terminal_ids
+        nonterminal_ids = self.nonterminal_ids
+    
         def get_new_nonterminal(base='X'):
             """Genera un nuevo no-terminal único."""
             while True:
                 name = f"{base}{next_nt_index[0]}"
                 next_nt_index[0] += 1
-                if name not in self.non_terminals and name not in new_grammar:
-                    self.non_terminals.add(name)
-                    return name
-        
+                sid = self.symbols.intern(name)
+                if sid not in nonterminal_ids and sid not in new_grammar:
+                    nonterminal_ids.add(sid)
+                    return sid
+    
         def get_terminal_nonterminal(terminal):
             """Obtiene o crea un no-terminal para un terminal."""
             if terminal not in terminal_map:
                 new_nt = get_new_nonterminal('T')
                 terminal_map[terminal] = new_nt
-                new_grammar[new_nt] = [terminal]
+                new_grammar[new_nt] = {(terminal,): None}
             return terminal_map[terminal]
-        
+    
         def get_intermediate_nonterminal(production):
             """Obtiene o crea un no-terminal para una producción intermedia.
             OPTIMIZACIÓN: Reutiliza no-terminales para producciones idénticas."""
             if production not in intermediate_map:
                 new_nt = get_new_nonterminal('Y')
                 intermediate_map[production] = new_nt
-                new_grammar[new_nt] = [production]
+                new_grammar[new_nt] = {production: None}
             return intermediate_map[production]
         
         # Procesar cada producción
-        for nt, prods in self.productions.items():
-            new_prods = []
-            
+        for nt, prods in self.rules.items():
+            new_prods = {}
+        
             for prod in prods:
-                if prod == 'ε':
-                    if nt == self.start_symbol:
-                        new_prods.append('ε')
+                if not prod:
+                    if nt == start:
+                        new_prods[()] = None
                     continue
-                
-                symbols = prod.split()
-                
+        
                 # Caso 1: A → a (terminal único) - ya está en CNF
-                if len(symbols) == 1 and symbols[0] in self.terminals:
-                    new_prods.append(prod)
-                
+                if len(prod) == 1 and prod[0] in terminal_ids:
+                    new_prods[prod] = None
+        
                 # Caso 2: A → BC (dos no-terminales) - ya está en CNF
-                elif len(symbols) == 2 and all(s in self.non_terminals for s in symbols):
-                    new_prods.append(prod)
-                
+                elif len(prod) == 2 and prod[0] in nonterminal_ids and prod[1] in nonterminal_ids:
+                    new_prods[prod] = None
+        
                 # Caso 3: Necesita conversión
                 else:
                     # Reemplazar terminales por no-terminales
-                    converted_symbols = []
-                    for symbol in symbols:
-                        if symbol in self.terminals:
-                            converted_symbols.append(get_terminal_nonterminal(symbol))
-                        else:
-                            converted_symbols.append(symbol)
-                    
+                    converted_symbols = [
+                        get_terminal_nonterminal(s) if s in terminal_ids else s for s in prod
+                    ]
+        
                     # Si hay más de 2 símbolos, crear producciones intermedias
                     while len(converted_symbols) > 2:
                         # OPTIMIZACIÓN: Reutilizar no-terminal si la producción ya existe
-                        last_two = ' '.join(converted_symbols[-2:])
+                        last_two = tuple(converted_symbols[-2:])
                         new_nt = get_intermediate_nonterminal(last_two)
-                        converted_symbols = converted_symbols[:-2] + [new_nt]
-                    
-                    new_prods.append(' '.join(converted_symbols))
-            
+                        converted_symbols[-2:] = [new_nt]
+        
+                    new_prods[tuple(converted_symbols)] = None
+        
             new_grammar[nt] = new_prods
         
-        self.productions = new_grammar
-        print(f"  ✓ Gramática convertida a CNF")
-        print(f"    - Nuevos no-terminales para terminales: {len(terminal_map)}")
-        print(f"    - Nuevos no-terminales intermedios: {len(intermediate_map)}")
-        print(f"    - Reglas optimizadas (sin duplicados)")
+        self.rules = new_grammar
+        self._stage_finished(4, stage, terminal_nonterminals=len(terminal_map),
+                             intermediate_nonterminals=len(intermediate_map))
         
         # Eliminar producciones unitarias que pudieron haberse creado
         self.remove_unit_productions()
     
+    def minimize_cnf(self, sample_sentences: Optional[List[str]] = None) -> dict:
+        """
+        Minimiza la gramática en CNF fusionando no-terminales equivalentes.
+        
+        Cada bloque de equivalent_nonterminals (refinamiento de particiones) se
+        reemplaza por un representante. Las reglas duplicadas o inalcanzables
+        tras la fusión se eliminan.
+        
+        Si se dan oraciones de muestra, mide el tiempo de CYK antes y después.
+        
+        Retorna: dict con símbolos/reglas antes y después, fusiones y speedup
+        """
+        before_time = self._time_sentences(sample_sentences) if sample_sentences else None
+        symbols_before = len(self.rules)
+        rules_before = self.count_rules()
+        names = self.symbols.names
+        
+        # Los terminales se codifican como ~id (negativos) para no confundirlos
+        # con los números de bloque. Representante de cada bloque: el símbolo
+        # inicial, luego los símbolos originales (no T*/Y* generados), luego
+        # orden alfabético
+        def preference(nt):
+            name = names[nt]
+            return (name != self.start_symbol, re.fullmatch(r'[TXY]\d+', name) is not None, name)
+        
+        _, id_map = equivalent_nonterminals(self.rules, lambda s: ~s, preference)
+        members = defaultdict(list)
+        for nt, representative in id_map.items():
+            members[representative].append(nt)
+        
+        # Reescribir las producciones de los representantes sin duplicados
+        merged = {}
+        for nt, prods in self.rules.items():
+            if id_map[nt] == nt:
+                merged[nt] = {tuple(id_map.get(s, s) for s in prod): None for prod in prods}
+        
+        # Eliminar lo que quedó inalcanzable desde el símbolo inicial
+        start = self.symbols.intern(self.start_symbol)
+        reachable = {start}
+        pending = [start]
+        while pending:
+            nt = pending.pop()
+            for prod in merged.get(nt, ()):
+                for s in prod:
+                    if s in merged and s not in reachable:
+                        reachable.add(s)
+                        pending.append(s)
+        
+        self.unminimized_rules = self.rules
+        self.rules = {nt: prods for nt, prods in merged.items() if nt in reachable}
+        self.nonterminal_ids -= set(id_map) - set(self.rules)
+        self.symbol_map = {names[nt]: names[rep] for nt, rep in id_map.items()}
+        self.merged_symbols = {
+            names[id_map[group[0]]]: sorted(names[nt] for nt in group)
+            for group in members.values() if len(group) > 1
+        }
+        
+        report = {
+            'symbols_before': symbols_before,
+            'symbols_after': len(self.rules),
+            'rules_before': rules_before,
+            'rules_after': self.count_rules(),
+            'merged': self.merged_symbols
+        }
+        if sample_sentences:
+            after_time = self._time_sentences(sample_sentences)
+            report['parse_time_before'] = before_time
+            report['parse_time_after'] = after_time
+            report['speedup'] = before_time / after_time if after_time else 0.0
+        
+        if self.events.enabled:
+            self.events.emit('grammar_minimized', **report)
+        return report
+    
+    def restore_tree_labels(self, tree: dict) -> dict:
+        """
+        Reconstruye un árbol de parsing obtenido con la gramática minimizada
+        usando las etiquetas de la gramática CNF sin minimizar.
+        
+        Se recorre de arriba hacia abajo: conocida la etiqueta original X de un
+        nodo, la fusión garantiza que existe X -> Y Z en la gramática original
+        con Y, Z equivalentes a las etiquetas de los hijos. La raíz conserva su
+        etiqueta (cada representante es miembro de su propio bloque), así que
+        también sirve para subárboles como los de ParseChart.tree(A, i, j).
+        """
+        if tree is None or not self.merged_symbols:
+            return tree
+        
+        ids = self.symbols.ids
+        names = self.symbols.names
+        symbol_map = self.symbol_map
+        root = dict(tree)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node['type'] != 'nonterminal':
+                continue
+            left, right = node['children']
+            labels = [left['symbol'], right['symbol']]
+            for prod in self.unminimized_rules.get(ids.get(node['symbol']), ()):
+                if (len(prod) == 2 and symbol_map.get(names[prod[0]]) == left['symbol']
+                        and symbol_map.get(names[prod[1]]) == right['symbol']):
+                    labels = [names[prod[0]], names[prod[1]]]
+                    break
+            node['children'] = [dict(left, symbol=labels[0]), dict(right, symbol=labels[1])]
+            stack.extend(node['children'])
+        return root
+    
+    def _time_sentences(self, sentences: List[str]) -> float:
+        """
+        Tiempo total de CYK (sin salida) sobre las oraciones con la gramática actual.
+        """
+        parser = self._build_parser()
+        return sum(parser.parse(sentence, verbose=False)[1] for sentence in sentences)
+    
+    def _build_parser(self) -> 'CYKParser':
+        """
+        Crea un CYKParser silencioso con la gramática actual.
+        """
+        parser = CYKParser(silent=True)
+        parser.load_compiled(self.compile())
+        return parser
+    
+    def compile(self) -> dict:
+        """
+        Genera en memoria las estructuras indexadas que usa CYKParser, sin pasar
+        por un archivo: las mismas que produciría load_cnf_grammar sobre la
+        salida de save_cnf_grammar (mismo orden: símbolo inicial y luego alfabético).
+        
+        Retorna: dict con 'grammar', 'terminal_rules', 'nonterminal_rules' y 'start_symbol'
+        """
+        names = self.symbols.names
+        grammar = {}
+        terminal_rules = {}
+        nonterminal_rules = {}
+        
+        order = sorted(self.rules, key=lambda nt: (names[nt] != self.start_symbol, names[nt]))
+        for nt in order:
+            left = names[nt]
+            symbol_lists = grammar[left] = []
+            for prod in self.rules[nt]:
+                # ε se indexa como el terminal 'ε', igual que al leerlo del archivo
+                symbols = [names[s] for s in prod] if prod else ['ε']
+                symbol_lists.append(symbols)
+                if len(symbols) == 1:
+                    terminal_rules.setdefault(symbols[0], []).append(left)
+                elif len(symbols) == 2:
+                    nonterminal_rules.setdefault((symbols[0], symbols[1]), []).append(left)
+        
+        return {
+            'grammar': grammar,
+            'terminal_rules': terminal_rules,
+            'nonterminal_rules': nonterminal_rules,
+            'start_symbol': self.start_symbol
+        }
+    
+    def _write_cnf(self, f):
+        """
+        Escribe la gramática en formato de archivo CNF.
+        """
+        productions = self.productions
+        
+        # Escribir el símbolo inicial primero
+        if self.start_symbol in productions:
+            prods = " | ".join(productions[self.start_symbol])
+            f.write(f"{self.start_symbol} -> {prods}\n")
+        
+        # Escribir el resto en orden alfabético
+        for nt in sorted(productions.keys()):
+            if nt != self.start_symbol:
+                prods = " | ".join(productions[nt])
+                f.write(f"{nt} -> {prods}\n")
+    
     def save_cnf_grammar(self, filename: str):
         """
         Guarda la gramática en CNF a un archivo.
         """
-        print(f"\n[5/5] Guardando gramática en CNF...")
+        stage = self._stage_started(5)
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                # Escribir el símbolo inicial primero
-                if self.start_symbol in self.productions:
-                    prods = " | ".join(self.productions[self.start_symbol])
-                    f.write(f"{self.start_symbol} -> {prods}\n")
-                
-                # Escribir el resto en orden alfabético
-                for nt in sorted(self.productions.keys()):
-                    if nt != self.start_symbol:
-                        prods = " | ".join(self.productions[nt])
-                        f.write(f"{nt} -> {prods}\n")
-            print(f"  ✓ Guardada en: {filename}")
+                self._write_cnf(f)
+            self._stage_finished(5, stage, filename=filename)
             return True
         except Exception as e:
-            print(f"  ✗ Error al guardar: {e}")
+            if self.events.enabled:
+                self.events.emit('stage_failed', step=5, name=STAGE_NAMES[5], filename=filename, error=e)
             return False
     
-    def full_conversion(self, input_file: str, output_file: str) -> bool:
+    def full_conversion(self, input_file: str, output_file: Optional[str] = None, minimize: bool = False) -> bool:
         """
         Proceso completo: carga gramática, convierte a CNF, y guarda.
+        Con minimize=True aplica además minimize_cnf antes de guardar.
+        Sin output_file no se escribe nada a disco (usar compile() para el parser).
         """
-        print("\n" + "="*60)
-        print("CONVERSIÓN A FORMA NORMAL DE CHOMSKY")
-        print("="*60)
+        if self.events.enabled:
+            self.events.emit('conversion_started', input_file=input_file, output_file=output_file)
         
         if not self.load_grammar(input_file):
             return False
         
-        self.display_grammar("GRAMÁTICA ORIGINAL")
+        if self.events.enabled:
+            self.events.emit('grammar_snapshot', title="GRAMÁTICA ORIGINAL", productions=self.productions)
         
         self.remove_epsilon_productions()
         self.remove_unit_productions()
         self.remove_useless_symbols()
         self.convert_to_cnf()
+        if minimize:
+            self.minimize_cnf()
         
-        self.display_grammar("GRAMÁTICA EN CNF")
+        if self.events.enabled:
+            self.events.emit('grammar_snapshot', title="GRAMÁTICA EN CNF", productions=self.productions)
         
+        if output_file is None:
+            return True
         return self.save_cnf_grammar(output_file)
 
 
+class _SparseRow(dict):
+    """
+    Fila de la tabla de parse_sparse: solo guarda las longitudes pobladas y
+    responde a las demás con una celda vacía de solo lectura (sin guardarla).
+    """
+
+    def __init__(self, empty):
+        super().__init__()
+        self.empty = empty
+
+    def __missing__(self, length):
+        return self.empty
+
+
+class ParseChart(dict):
+    """
+    Resultado de CYKParser.parse: el mismo dict de siempre ('table',
+    'parse_info', 'words') con consultas sobre la tabla ya llenada, para
+    responder muchas preguntas (no-terminal, subcadena) con un solo parse.
+
+    Sin presupuesto la tabla es la de siempre: n filas de n + 1 celdas. Con
+    presupuesto se crea a medida que se llena: table[i] es una lista que crece
+    hasta la última longitud llenada (parse) o una fila dispersa con solo las
+    longitudes pobladas (parse_sparse).
+    
+    El índice por no-terminal se construye una vez, en la primera consulta
+    que lo necesita; has() y accepts() son O(1) y spans() es O(salida).
+    """
+    
+    def __init__(self, parser: 'CYKParser', table: List[List[Set[str]]],
+                 parse_info: List[List[Dict[str, tuple]]], words: List[str]):
+        super().__init__(table=table, parse_info=parse_info, words=words)
+        self.parser = parser
+        self.start_symbol = parser.start_symbol
+        self._spans = None  # Dict[str, List[Tuple[int, int]]] - no-terminal -> subcadenas
+    
+    def has(self, symbol: str, i: int, j: int) -> bool:
+        """
+        Indica si `symbol` deriva words[i:j].
+        """
+        if not 0 <= i < j <= len(self['words']):
+            return False
+        return symbol in self._cell(i, j - i)
+    
+    def symbols(self, i: int, j: int) -> Set[str]:
+        """
+        No-terminales que derivan words[i:j].
+        """
+        if not 0 <= i < j <= len(self['words']):
+            return set()
+        return set(self._cell(i, j - i))
+    
+    def spans(self, symbol: str) -> List[Tuple[int, int]]:
+        """
+        Todas las subcadenas (i, j) que deriva `symbol`, ordenadas por inicio y fin.
+        """
+        if self._spans is None:
+            index = defaultdict(list)
+            for i, row in enumerate(self['table']):
+                cells = sorted(row.items()) if isinstance(row, dict) else enumerate(row)
+                for length, cell in cells:
+                    for A in cell:
+                        index[A].append((i, i + length))
+            self._spans = dict(index)
+        return list(self._spans.get(symbol, ()))
+    
+    def accepts(self, start: Optional[str] = None) -> bool:
+        """
+        Indica si la oración completa se deriva de `start` (por defecto start_symbol).
+        """
+        return self.has(start or self.start_symbol, 0, len(self['words']))
+    
+    def tree(self, symbol: Optional[str] = None, i: int = 0, j: Optional[int] = None) -> Optional[dict]:
+        """
+        Árbol de derivación de `symbol` sobre words[i:j] (None si no lo deriva).
+        """
+        symbol = symbol or self.start_symbol
+        if j is None:
+            j = len(self['words'])
+        if not self.has(symbol, i, j):
+            return None
+        return self.parser.build_parse_tree(self, symbol, i, j)
+
+    def _cell(self, i: int, length: int) -> Set[str]:
+        """
+        Celda table[i][length]; vacía si el parse (abortado) no llegó a esa longitud.
+        """
+        try:
+            return self['table'][i][length]
+        except IndexError:
+            return set()
+
+
 class CYKParser:
     """
     Implementación del algoritmo CYK para parsing de gramáticas en CNF.
     """
     
-    def __init__(self):
+    # Entradas de la agenda entre revisiones del presupuesto en parse_sparse
+    BUDGET_CHECK_INTERVAL = 256
+    
+    def __init__(self, silent: bool = False, events: Optional[EventEmitter] = None):
         self.grammar = {}  # Dict[str, List[List[str]]]
         self.terminal_rules = {}  # Dict[str, List[str]] - terminal -> [non-terminals]
         self.nonterminal_rules = {}  # Dict[Tuple[str,str], List[str]]
         self.start_symbol = 'S'
+        self.events = make_events(silent, events)
+        self._pair_index = None  # Índices B -> {C: [A]} y C -> {B: [A]} para parse_sparse
     
     def tokenize_production(self, prod: str) -> List[str]:
         """
@@ -552,6 +1334,7 @@ class CYKParser:
             self.grammar.clear()
             self.terminal_rules.clear()
             self.nonterminal_rules.clear()
+            self._pair_index = None
             
             first_nonterminal = None
             
@@ -604,40 +1387,115 @@ class CYKParser:
             if first_nonterminal:
                 self.start_symbol = first_nonterminal
             
-            print(f"✓ Gramática CNF cargada: {len(self.grammar)} reglas")
+            if self.events.enabled:
+                self.events.emit('cnf_loaded', filename=filename, rules=len(self.grammar),
+                                 terminal_rules=len(self.terminal_rules),
+                                 nonterminal_rules=len(self.nonterminal_rules))
             return True
             
         except Exception as e:
-            print(f"Error al cargar gramática CNF: {e}")
+            if self.events.enabled:
+                self.events.emit('cnf_load_failed', filename=filename, error=e)
             return False
     
-    def parse(self, sentence: str, verbose=True) -> Tuple[bool, float, Optional[dict]]:
+    def load_compiled(self, compiled: dict) -> bool:
+        """
+        Carga las estructuras generadas por CNFConverter.compile() (sin archivo).
+        """
+        self.grammar = compiled['grammar']
+        self.terminal_rules = compiled['terminal_rules']
+        self.nonterminal_rules = compiled['nonterminal_rules']
+        self.start_symbol = compiled['start_symbol']
+        self._pair_index = None
+        
+        if self.events.enabled:
+            self.events.emit('cnf_loaded', filename=None, rules=len(self.grammar),
+                             terminal_rules=len(self.terminal_rules),
+                             nonterminal_rules=len(self.nonterminal_rules))
+        return True
+    
+    def patch_rules(self, left: str, added: List[List[str]] = (), removed: List[List[str]] = ()):
+        """
+        Actualiza en su lugar las producciones de un no-terminal (y los índices
+        terminal_rules / nonterminal_rules) sin recargar la gramática completa.
+        Si se queda sin producciones, el no-terminal se elimina.
+        """
+        productions = self.grammar.setdefault(left, [])
+        for symbols in removed:
+            productions.remove(symbols)
+            if len(symbols) == 1:
+                index, key = self.terminal_rules, symbols[0]
+            elif len(symbols) == 2:
+                index, key = self.nonterminal_rules, (symbols[0], symbols[1])
+            else:
+                continue
+            lefts = index[key]
+            lefts.remove(left)
+            if not lefts:
+                del index[key]
+        
+        for symbols in added:
+            productions.append(symbols)
+            if len(symbols) == 1:
+                self.terminal_rules.setdefault(symbols[0], []).append(left)
+            elif len(symbols) == 2:
+                self.nonterminal_rules.setdefault((symbols[0], symbols[1]), []).append(left)
+        
+        if not productions:
+            del self.grammar[left]
+        self._pair_index = None
+    
+    def parse(self, sentence: str, verbose=True,
+              budget: Optional[ParseBudget] = None) -> Tuple[Optional[bool], float, Optional[dict]]:
         """
         Algoritmo CYK para determinar si una oracion pertenece al lenguaje.
         
-        Retorna: (acepta: bool, tiempo: float, tabla: dict)
+        Con `budget` se revisan tiempo, celdas, reglas y cancelación antes de
+        cada longitud de subcadena; si se agota, acepta es None y los datos
+        incluyen 'budget_exceeded' con el motivo y las estadísticas parciales
+        (la tabla queda completa hasta 'completed_length'). Con presupuesto las
+        celdas de cada longitud se crean al llegar a ella, así que un parse
+        abortado solo reserva la memoria del trabajo que el presupuesto permitió.
+        
+        Retorna: (acepta: bool o None, tiempo: float, tabla: ParseChart)
         """
+        limit = budget.start() if budget is not None else None
+        start_time = time.time()
         words = sentence.lower().split()
         n = len(words)
         
         if n == 0:
             return False, 0.0, None
         
-        start_time = time.time()
+        # Trabajo realizado: celdas [i,j) procesadas y aplicaciones de reglas;
+        # la primera revisión rechaza de entrada si la diagonal excede max_cells
+        cells = 0
+        rules = 0
+        reason = budget.exceeded(limit, n, 0) if budget is not None else None
         
         # Tabla CYK: table[i][j] = conjunto de no-terminales que derivan words[i:i+j]
-        # Guardamos también el parse tree
-        table = [[set() for _ in range(n + 1)] for _ in range(n)]
-        parse_info = [[{} for _ in range(n + 1)] for _ in range(n)]
+        # Guardamos también el parse tree. Con presupuesto cada fila crece una
+        # celda por longitud en lugar de reservar las n + 1 desde el inicio.
+        if budget is None:
+            table = [[set() for _ in range(n + 1)] for _ in range(n)]
+            parse_info = [[{} for _ in range(n + 1)] for _ in range(n)]
+        else:
+            table = [[set()] for _ in range(n)]
+            parse_info = [[{}] for _ in range(n)]
+        parse_data = ParseChart(self, table, parse_info, words)
+        
+        # Los eventos por celda solo se construyen si alguien los escucha
+        trace = verbose and self.events.enabled
         
         # Paso 1: Llenar la diagonal (subcadenas de longitud 1)
-        if verbose:
-            print(f"\n{'='*60}")
-            print("ALGORITMO CYK - ANÁLISIS")
-            print('='*60)
-            print(f"Oracion: {sentence}")
-            print(f"Palabras: {words}")
-            print(f"\nPaso 1: Subcadenas de longitud 1")
+        if trace:
+            self.events.emit('parse_started', sentence=sentence, words=words)
+        if reason is not None:
+            return self._abort(reason, 0, n, cells, rules, start_time, parse_data, trace)
+        if budget is not None:
+            self._grow_rows(table, parse_info, n)
+        if trace:
+            self.events.emit('cyk_step', length=1)
         
         for i in range(n):
             word = words[i]
@@ -645,13 +1503,20 @@ class CYKParser:
                 for nt in self.terminal_rules[word]:
                     table[i][1].add(nt)
                     parse_info[i][1][nt] = ('terminal', word)
-                    if verbose:
-                        print(f"  [{i},{i+1}] '{word}' -> {nt}")
+                    rules += 1
+                    if trace:
+                        self.events.emit('cyk_cell', i=i, j=i + 1, substring=word, symbol=nt)
+        cells = n
         
         # Paso 2: Llenar la tabla para subcadenas de longitud 2 a n
         for length in range(2, n + 1):
-            if verbose:
-                print(f"\nPaso {length}: Subcadenas de longitud {length}")
+            if budget is not None:
+                reason = budget.exceeded(limit, cells + n - length + 1, rules)
+                if reason is not None:
+                    return self._abort(reason, length - 1, n, cells, rules, start_time, parse_data, trace)
+                self._grow_rows(table, parse_info, n - length + 1)
+            if trace:
+                self.events.emit('cyk_step', length=length)
             
             for i in range(n - length + 1):
                 j = i + length
@@ -667,12 +1532,14 @@ class CYKParser:
                         for C in right_symbols:
                             if (B, C) in self.nonterminal_rules:
                                 for A in self.nonterminal_rules[(B, C)]:
+                                    rules += 1
                                     if A not in table[i][j - i]:
                                         table[i][j - i].add(A)
                                         parse_info[i][j - i][A] = ('nonterminal', B, C, k)
-                                        if verbose:
-                                            substr = ' '.join(words[i:j])
-                                            print(f"  [{i},{j}] '{substr}' -> {A} (via {B} {C}, k={k})")
+                                        if trace:
+                                            self.events.emit('cyk_cell', i=i, j=j, substring=' '.join(words[i:j]),
+                                                             symbol=A, split=(B, C, k))
+            cells += n - length + 1
         
         end_time = time.time()
         elapsed = end_time - start_time
@@ -680,17 +1547,311 @@ class CYKParser:
         # Verificar si el símbolo inicial está en table[0][n]
         accepted = self.start_symbol in table[0][n]
         
-        if verbose:
-            print(f"\n{'='*60}")
-            print(f"RESULTADO: {'✓ ACEPTADA' if accepted else '✗ RECHAZADA'}")
-            print(f"Tiempo de ejecución: {elapsed*1000:.4f} ms")
-            print('='*60)
+        if trace:
+            self.events.emit('parse_finished', accepted=accepted, elapsed=elapsed)
+        
+        return accepted, elapsed, parse_data
+    
+    @staticmethod
+    def _grow_rows(table: List[List[Set[str]]], parse_info: List[List[Dict[str, tuple]]], rows: int):
+        """
+        Agrega la celda de la siguiente longitud a las primeras `rows` filas
+        (tabla de un parse con presupuesto, que crece a medida que se llena).
+        """
+        for i in range(rows):
+            table[i].append(set())
+            parse_info[i].append({})
+    
+    def _abort(self, reason: str, completed_length: int, length: int, cells: int, rules: int,
+               start_time: float, parse_data: dict, trace: bool) -> Tuple[None, float, dict]:
+        """
+        Resultado de un parse detenido por su presupuesto: acepta es None y los
+        datos parciales llevan 'budget_exceeded' con el motivo y el trabajo hecho.
+        """
+        elapsed = time.time() - start_time
+        stats = {
+            'reason': reason,
+            'completed_length': completed_length,
+            'length': length,
+            'cells': cells,
+            'rules': rules,
+            'elapsed': elapsed
+        }
+        parse_data['budget_exceeded'] = stats
+        if trace:
+            self.events.emit('parse_aborted', **stats)
+        return None, elapsed, parse_data
+    
+    def recognize(self, words: List[str]) -> bool:
+        """
+        Versión mínima de CYK: solo decide si la lista de palabras pertenece al
+        lenguaje, sin guardar parse_info ni imprimir (para validación masiva).
+        """
+        n = len(words)
+        if n == 0:
+            return False
+        
+        terminal_rules = self.terminal_rules
+        
+        # table[i][j] = no-terminales que derivan words[i:i+j]
+        table = [[None] * (n + 1) for _ in range(n)]
+        for i, word in enumerate(words):
+            if word not in terminal_rules:
+                # Ninguna subcadena que contenga esta palabra puede derivarse
+                return False
+            table[i][1] = set(terminal_rules[word])
+        
+        self.fill_table(table)
+        return self.start_symbol in table[0][n]
+    
+    def fill_table(self, table: List[List[Optional[Set[str]]]],
+                   probes: Optional[List[Tuple[Set[str], Set[str]]]] = None):
+        """
+        Llena las longitudes 2..n de una tabla de recognize (n filas de n + 1
+        celdas) cuya diagonal table[i][1] ya está llena.
+        
+        Con `probes`, agrega a la lista las celdas (izquierda, derecha) de cada
+        partición combinada: los pares (B, C) consultados en nonterminal_rules
+        (con o sin regla) son su producto cartesiano. Se agrega por partición,
+        fuera del ciclo interno, así que sin lista el llenado no paga nada extra.
+        """
+        n = len(table)
+        nonterminal_rules = self.nonterminal_rules
+        
+        for length in range(2, n + 1):
+            for i in range(n - length + 1):
+                cell = set()
+                for split in range(1, length):
+                    right_symbols = table[i + split][length - split]
+                    if not right_symbols:
+                        continue
+                    left_symbols = table[i][split]
+                    if probes is not None:
+                        probes.append((left_symbols, right_symbols))
+                    for B in left_symbols:
+                        for C in right_symbols:
+                            heads = nonterminal_rules.get((B, C))
+                            if heads:
+                                cell.update(heads)
+                table[i][length] = cell
+
+    def _pair_indexes(self) -> Tuple[Dict[str, Dict[str, List[str]]], Dict[str, Dict[str, List[str]]]]:
+        """
+        Índices de nonterminal_rules por hijo izquierdo y por hijo derecho.
+        Se construyen una vez y se reutilizan hasta que cambie la gramática.
+        """
+        if self._pair_index is None:
+            by_left = defaultdict(dict)
+            by_right = defaultdict(dict)
+            for (B, C), heads in self.nonterminal_rules.items():
+                by_left[B][C] = heads
+                by_right[C][B] = heads
+            self._pair_index = (dict(by_left), dict(by_right))
+        return self._pair_index
+    
+    def parse_sparse(self, sentence: str, verbose=False,
+                     budget: Optional[ParseBudget] = None) -> Tuple[Optional[bool], float, Optional[dict]]:
+        """
+        CYK disperso guiado por agenda: solo visita celdas pobladas.
+        
+        Cada entrada nueva A sobre [i,k) se combina únicamente con las entradas
+        que empiezan en k (como hijo izquierdo) o terminan en i (como hijo
+        derecho) y que tienen una regla compatible en nonterminal_rules. El costo
+        depende del número de entradas pobladas y no de n³. Produce la misma
+        tabla que parse(); parse_info puede registrar otra derivación válida.
+        
+        Sin longitudes que recorrer, el presupuesto se revisa cada
+        BUDGET_CHECK_INTERVAL entradas de la agenda (celdas = entradas pobladas).
+        Con presupuesto cada fila de la tabla guarda solo sus celdas pobladas,
+        así que la memoria sigue al número de entradas y no a n².
+        
+        Retorna: (acepta: bool o None, tiempo: float, tabla: ParseChart)
+        """
+        limit = budget.start() if budget is not None else None
+        start_time = time.time()
+        words = sentence.lower().split()
+        n = len(words)
+        
+        if n == 0:
+            return False, 0.0, None
+        
+        cells = 0
+        rules = 0
+        reason = budget.exceeded(limit, n, 0) if budget is not None else None
+        
+        by_left, by_right = self._pair_indexes()
+        trace = verbose and self.events.enabled
+        if trace:
+            self.events.emit('parse_started', sentence=sentence, words=words)
+        
+        empty_cell = frozenset()
+        if budget is None:
+            table = [[set() for _ in range(n + 1)] for _ in range(n)]
+            parse_info = [[{} for _ in range(n + 1)] for _ in range(n)]
+        else:
+            table = [_SparseRow(empty_cell) for _ in range(n)]
+            parse_info = [_SparseRow(MappingProxyType({})) for _ in range(n)]
+        parse_data = ParseChart(self, table, parse_info, words)
+        if reason is not None:
+            return self._abort(reason, None, n, cells, rules, start_time, parse_data, trace)
+        # starts_at[k][C] = fines j de entradas C sobre [k,j)
+        # ends_at[k][B] = inicios i de entradas B sobre [i,k)
+        starts_at = [{} for _ in range(n + 1)]
+        ends_at = [{} for _ in range(n + 1)]
+        agenda = []
+        
+        def add(A, i, j, info):
+            nonlocal cells, rules
+            rules += 1
+            cell = table[i][j - i]
+            if A not in cell:
+                if cell is empty_cell:
+                    # Primera entrada de la celda en una fila dispersa
+                    cell = table[i][j - i] = set()
+                    parse_info[i][j - i] = {}
+                cells += 1
+                cell.add(A)
+                parse_info[i][j - i][A] = info
+                agenda.append((A, i, j))
+                if trace:
+                    self.events.emit('cyk_cell', i=i, j=j, substring=' '.join(words[i:j]), symbol=A,
+                                     split=info[1:] if info[0] == 'nonterminal' else None)
+        
+        for i, word in enumerate(words):
+            for nt in self.terminal_rules.get(word, ()):
+                add(nt, i, i + 1, ('terminal', word))
+        
+        processed = 0
+        while agenda:
+            if budget is not None and processed % self.BUDGET_CHECK_INTERVAL == 0:
+                reason = budget.exceeded(limit, cells, rules)
+                if reason is not None:
+                    return self._abort(reason, None, n, cells, rules, start_time, parse_data, trace)
+            processed += 1
+            X, i, k = agenda.pop()
+            
+            # X como hijo izquierdo: A -> X C con C sobre [k, j)
+            partners = by_left.get(X)
+            if partners:
+                right_items = starts_at[k]
+                if len(partners) <= len(right_items):
+                    pairs = ((C, heads, right_items.get(C)) for C, heads in partners.items())
+                else:
+                    pairs = ((C, partners.get(C), ends) for C, ends in right_items.items())
+                for C, heads, ends in pairs:
+                    if heads and ends:
+                        for j in ends:
+                            for A in heads:
+                                add(A, i, j, ('nonterminal', X, C, k))
+            
+            # X como hijo derecho: A -> B X con B sobre [h, i)
+            partners = by_right.get(X)
+            if partners:
+                left_items = ends_at[i]
+                if len(partners) <= len(left_items):
+                    pairs = ((B, heads, left_items.get(B)) for B, heads in partners.items())
+                else:
+                    pairs = ((B, partners.get(B), starts) for B, starts in left_items.items())
+                for B, heads, starts in pairs:
+                    if heads and starts:
+                        for h in starts:
+                            for A in heads:
+                                add(A, h, k, ('nonterminal', B, X, i))
+            
+            starts_at[i].setdefault(X, []).append(k)
+            ends_at[k].setdefault(X, []).append(i)
+        
+        elapsed = time.time() - start_time
+        accepted = self.start_symbol in table[0][n]
+        
+        if trace:
+            self.events.emit('parse_finished', accepted=accepted, elapsed=elapsed)
         
-        return accepted, elapsed, {'table': table, 'parse_info': parse_info, 'words': words}
+        return accepted, elapsed, parse_data
+    
+    def parse_stream(self, tokens: Iterable[str], window: int,
+                     symbol: Optional[str] = None) -> Iterator[dict]:
+        """
+        CYK acotado a subcadenas de a lo sumo `window` tokens sobre un flujo sin
+        fin (p. ej. un log tokenizado). Solo guarda las últimas `window` columnas
+        (celdas por posición final), así que usa O(W²) memoria y O(n·W²) tiempo.
+        
+        Genera, en orden, cada subcadena maximal que deriva `symbol` (por defecto
+        start_symbol): {'symbol', 'span': (inicio, fin), 'words'}. Una subcadena se
+        emite en cuanto ninguna posterior de longitud <= window puede contenerla.
+        """
+        if window < 1:
+            raise ValueError(f"La ventana debe ser al menos 1: {window}")
+        if symbol is None:
+            symbol = self.start_symbol
+        
+        terminal_rules = self.terminal_rules
+        nonterminal_rules = self.nonterminal_rules
+        
+        # columns[fin % window][L] = no-terminales que derivan words[fin-L:fin]
+        columns = [None] * window
+        recent = [None] * window  # recent[pos % window] = token en pos
+        pending = []  # Candidatas (inicio, fin) aún no maximales, crecientes en ambos
+        end = 0
+        
+        for word in tokens:
+            word = word.lower()
+            recent[end % window] = word
+            end += 1
+            
+            column = [None] * (window + 1)
+            column[1] = set(terminal_rules.get(word, ()))
+            longest = 1 if symbol in column[1] else 0
+            for length in range(2, min(window, end) + 1):
+                start = end - length
+                cell = set()
+                for split in range(1, length):
+                    right_symbols = column[length - split]
+                    if not right_symbols:
+                        continue
+                    for B in columns[(start + split) % window][split]:
+                        for C in right_symbols:
+                            heads = nonterminal_rules.get((B, C))
+                            if heads:
+                                cell.update(heads)
+                column[length] = cell
+                if symbol in cell:
+                    longest = length
+            columns[end % window] = column
+            
+            if longest:
+                # La nueva candidata contiene a las pendientes que empiezan después
+                start = end - longest
+                while pending and pending[-1][0] >= start:
+                    pending.pop()
+                pending.append((start, end))
+            
+            # Nada que termine después de inicio + window puede contener la candidata
+            emitted = 0
+            while emitted < len(pending) and pending[emitted][0] + window <= end:
+                yield self._stream_span(symbol, pending[emitted], recent, window)
+                emitted += 1
+            del pending[:emitted]
+        
+        for span in pending:
+            yield self._stream_span(symbol, span, recent, window)
+    
+    def _stream_span(self, symbol: str, span: Tuple[int, int], recent: List[str], window: int) -> dict:
+        """
+        Resultado de parse_stream para una subcadena aún dentro de la ventana.
+        """
+        start, end = span
+        return {
+            'symbol': symbol,
+            'span': span,
+            'words': [recent[pos % window] for pos in range(start, end)]
+        }
     
     def build_parse_tree(self, parse_data: dict, symbol: str = None, i: int = 0, j: int = None) -> dict:
         """
         Construye el árbol de parsing a partir de la tabla CYK.
+        Usa una pila explícita, así que la profundidad del árbol no está
+        limitada por el límite de recursión de Python.
         """
         if symbol is None:
             symbol = self.start_symbol
@@ -701,100 +1862,85 @@ class CYKParser:
         if j is None:
             j = n
         
-        table = parse_data['table']
         parse_info = parse_data['parse_info']
         
-        length = j - i
-        
-        if symbol not in parse_info[i][length]:
+        # Un parse abortado por su presupuesto no llegó a llenar esta longitud
+        if j - i >= len(parse_info[i]) and not isinstance(parse_info[i], dict):
             return None
         
-        info = parse_info[i][length][symbol]
-        
-        if info[0] == 'terminal':
-            # Nodo hoja
-            return {
-                'symbol': symbol,
-                'type': 'terminal',
-                'value': info[1],
-                'span': (i, j)
-            }
-        else:
-            # Nodo interno
-            _, B, C, k = info
-            left_child = self.build_parse_tree(parse_data, B, i, k)
-            right_child = self.build_parse_tree(parse_data, C, k, j)
+        # Cada tarea construye un nodo y lo guarda en slot[index]
+        root = [None]
+        stack = [(symbol, i, j, root, 0)]
+        while stack:
+            A, start, end, slot, index = stack.pop()
+            info = parse_info[start][end - start].get(A)
+            if info is None:
+                continue
             
-            return {
-                'symbol': symbol,
-                'type': 'nonterminal',
-                'children': [left_child, right_child],
-                'span': (i, j)
-            }
+            if info[0] == 'terminal':
+                # Nodo hoja
+                slot[index] = {
+                    'symbol': A,
+                    'type': 'terminal',
+                    'value': info[1],
+                    'span': (start, end)
+                }
+            else:
+                # Nodo interno
+                _, B, C, k = info
+                children = [None, None]
+                slot[index] = {
+                    'symbol': A,
+                    'type': 'nonterminal',
+                    'children': children,
+                    'span': (start, end)
+                }
+                stack.append((C, k, end, children, 1))
+                stack.append((B, start, k, children, 0))
+        
+        return root[0]
     
     def print_parse_tree(self, tree: dict, indent: int = 0):
         """
         Imprime el árbol de parsing de forma legible.
         """
-        if tree is None:
-            return
-        
-        prefix = "  " * indent
-        
-        if tree['type'] == 'terminal':
-            print(f"{prefix}{tree['symbol']} -> '{tree['value']}'")
-        else:
-            print(f"{prefix}{tree['symbol']}")
-            for child in tree['children']:
-                self.print_parse_tree(child, indent + 1)
-    
-    def save_parse_tree_graphviz(self, tree: dict, filename: str):
-        """
-        Guarda el árbol de parsing en formato DOT (Graphviz).
-        """
-        node_counter = [0]
-        
-        def get_node_id():
-            node_counter[0] += 1
-            return f"n{node_counter[0]}"
-        
-        def tree_to_dot(node, parent_id=None):
+        stack = [(tree, indent)]
+        while stack:
+            node, depth = stack.pop()
             if node is None:
-                return ""
+                continue
             
-            node_id = get_node_id()
+            prefix = "  " * depth
             
             if node['type'] == 'terminal':
-                label = f"{node['symbol']}\\n'{node['value']}'"
-                shape = "box"
+                print(f"{prefix}{node['symbol']} -> '{node['value']}'")
             else:
-                label = node['symbol']
-                shape = "ellipse"
-            
-            dot = f'  {node_id} [label="{label}", shape={shape}];\n'
-            
-            if parent_id:
-                dot += f'  {parent_id} -> {node_id};\n'
-            
-            if node['type'] == 'nonterminal':
-                for child in node['children']:
-                    dot += tree_to_dot(child, node_id)
-            
-            return dot
-        
+                print(f"{prefix}{node['symbol']}")
+                stack.extend((child, depth + 1) for child in reversed(node['children']))
+    
+    def save_parse_tree(self, tree: dict, filename: str, fmt: str = 'dot') -> bool:
+        """
+        Guarda el árbol en `fmt` ('dot', 'bracketed' o 'json'), escribiéndolo
+        de forma incremental en el archivo.
+        """
+        if fmt not in TREE_WRITERS:
+            raise ValueError(f"Formato de árbol desconocido: {fmt}")
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write("digraph ParseTree {\n")
-                f.write("  rankdir=TB;\n")
-                f.write("  node [fontname=\"Arial\"];\n")
-                f.write(tree_to_dot(tree))
-                f.write("}\n")
-            print(f"✓ Árbol guardado en: {filename}")
-            print(f"  Para visualizar: dot -Tpng {filename} -o parse_tree.png")
+                TREE_WRITERS[fmt](tree, f)
+            if self.events.enabled:
+                self.events.emit('tree_saved', filename=filename)
             return True
         except Exception as e:
-            print(f"✗ Error al guardar árbol: {e}")
+            if self.events.enabled:
+                self.events.emit('tree_save_failed', filename=filename, error=e)
             return False
+    
+    def save_parse_tree_graphviz(self, tree: dict, filename: str):
+        """
+        Guarda el árbol de parsing en formato DOT (Graphviz).
+        """
+        return self.save_parse_tree(tree, filename, 'dot')
 
 
 def list_grammar_files(directory="exercises"):
@@ -894,8 +2040,8 @@ def main():
                 print(f"📁 Salida:   {output_file}")
                 
                 if converter.full_conversion(input_file, output_file):
-                    # Cargar automáticamente en el parser
-                    parser.load_cnf_grammar(output_file)
+                    # Cargar automáticamente en el parser (en memoria, sin releer el archivo)
+                    parser.load_compiled(converter.compile())
             
             elif choice == '2':
                 # Buscar primero en output/, luego en exercises/
@@ -0,0 +1,398 @@
+"""
+Proyecto 2 - Parser Earley
+Teoría de la Computación
+Algoritmo de Earley sobre la gramática CFG original (sin conversión a CNF)
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+from cyk_parser import CNFConverter, CYKParser, EventEmitter, ParseBudget, make_events
+
+
+class EarleyParser:
+    """
+    Implementación del algoritmo de Earley para gramáticas CFG arbitrarias.
+    Consume directamente las producciones de CNFConverter.load_grammar:
+    maneja producciones-ε y unitarias de forma nativa (Aycock-Horspool)
+    y construye árboles sobre los no-terminales originales.
+    """
+
+    def __init__(self, silent: bool = False, events: Optional[EventEmitter] = None):
+        self.rules = []  # List[Tuple[str, Tuple[str, ...]]] - (lado izquierdo, símbolos)
+        self.rules_by_lhs = {}  # Dict[str, List[int]] - no-terminal -> índices de reglas
+        self.nullable = set()
+        self.null_rule = {}  # Dict[str, int] - regla que deriva ε para cada anulable
+        self.start_symbol = 'S'
+        self.events = make_events(silent, events)
+
+    def load_from_converter(self, converter: CNFConverter) -> bool:
+        """
+        Indexa las producciones actuales de un CNFConverter (sin convertirlas).
+        """
+        self.rules = []
+        self.rules_by_lhs = {}
+
+        names = converter.symbols.names
+        for nt_id, prods in converter.rules.items():
+            nt = names[nt_id]
+            self.rules_by_lhs[nt] = []
+            for prod in prods:
+                self.rules_by_lhs[nt].append(len(self.rules))
+                self.rules.append((nt, tuple(names[s] for s in prod)))
+
+        if not self.rules:
+            return False
+
+        self.start_symbol = converter.start_symbol
+        self._compute_nullable()
+        return True
+
+    def load_grammar(self, filename: str) -> bool:
+        """
+        Carga una gramática CFG desde un archivo.
+        """
+        converter = CNFConverter(events=self.events)
+        if not converter.load_grammar(filename):
+            return False
+        return self.load_from_converter(converter)
+
+    def _compute_nullable(self):
+        """
+        Calcula los símbolos anulables y, para cada uno, la regla con la que
+        se descubrió (así la derivación ε resultante nunca es cíclica).
+        """
+        self.nullable = set()
+        self.null_rule = {}
+
+        changed = True
+        while changed:
+            changed = False
+            for index, (nt, symbols) in enumerate(self.rules):
+                if nt not in self.nullable and all(s in self.nullable for s in symbols):
+                    self.nullable.add(nt)
+                    self.null_rule[nt] = index
+                    changed = True
+
+    def parse(self, sentence: str, verbose=False,
+              budget: Optional[ParseBudget] = None) -> Tuple[Optional[bool], float, Optional[dict]]:
+        """
+        Algoritmo de Earley para determinar si una oracion pertenece al lenguaje.
+
+        El presupuesto opcional empieza al entrar y se revisa antes de crear el
+        chart y antes de cada columna (celdas = ítems, reglas = compleciones);
+        si se agota, acepta es None y los datos parciales incluyen 'budget_exceeded'.
+
+        Retorna: (acepta: bool o None, tiempo: float, datos: dict)
+        """
+        limit = budget.start() if budget is not None else None
+        start_time = time.time()
+        words = sentence.lower().split()
+        n = len(words)
+
+        if n == 0:
+            return False, 0.0, None
+
+        trace = verbose and self.events.enabled
+        if trace:
+            self.events.emit('parse_started', sentence=sentence, words=words, algorithm='EARLEY')
+
+        rules = self.rules
+        rules_by_lhs = self.rules_by_lhs
+        nullable = self.nullable
+        seeds = rules_by_lhs.get(self.start_symbol, [])
+
+        # Trabajo realizado: ítems de las columnas cerradas y compleciones
+        cells = 0
+        completions = 0
+        if budget is not None:
+            reason = budget.exceeded(limit, len(seeds), completions)
+            if reason is not None:
+                parse_data = {'chart': [], 'root': None, 'words': words}
+                return self._abort(reason, 0, n, cells, completions, start_time, parse_data, trace)
+
+        # chart[j] = {item: backpointer}, item = (regla, punto, origen)
+        # El primer backpointer registrado se conserva: los ítems se crean en
+        # orden topológico, por lo que la derivación reconstruida es acíclica.
+        chart = [{} for _ in range(n + 1)]
+        # waiting[j][B] = ítems de chart[j] con el punto antes de B
+        waiting = [{} for _ in range(n + 1)]
+        for r in seeds:
+            chart[0][(r, 0, 0)] = None
+
+        for j in range(n + 1):
+            items = chart[j]
+            if budget is not None and j:
+                reason = budget.exceeded(limit, cells + len(items), completions)
+                if reason is not None:
+                    parse_data = {'chart': chart, 'root': None, 'words': words}
+                    return self._abort(reason, j, n, cells, completions, start_time, parse_data, trace)
+            agenda = list(items)
+            waiting_here = waiting[j]
+            predicted = set()
+
+            while agenda:
+                item = agenda.pop()
+                r, dot, origin = item
+                lhs, symbols = rules[r]
+
+                if dot < len(symbols):
+                    symbol = symbols[dot]
+                    if symbol in rules_by_lhs:
+                        # Predicción
+                        waiting_here.setdefault(symbol, []).append(item)
+                        if symbol not in predicted:
+                            predicted.add(symbol)
+                            for rb in rules_by_lhs[symbol]:
+                                new_item = (rb, 0, j)
+                                if new_item not in items:
+                                    items[new_item] = None
+                                    agenda.append(new_item)
+                        # Avance sobre anulables (Aycock-Horspool)
+                        if symbol in nullable:
+                            new_item = (r, dot + 1, origin)
+                            if new_item not in items:
+                                items[new_item] = ('null', item)
+                                agenda.append(new_item)
+                    elif j < n and symbol == words[j]:
+                        # Escaneo
+                        new_item = (r, dot + 1, origin)
+                        if new_item not in chart[j + 1]:
+                            chart[j + 1][new_item] = ('scan', item)
+                else:
+                    # Compleción
+                    completions += 1
+                    for parent in waiting[origin].get(lhs, ()):
+                        pr, pdot, porigin = parent
+                        new_item = (pr, pdot + 1, porigin)
+                        if new_item not in items:
+                            items[new_item] = ('complete', parent, item)
+                            agenda.append(new_item)
+
+            if trace:
+                completed = sorted({
+                    rules[r][0] for (r, dot, origin) in items if dot == len(rules[r][1])
+                })
+                self.events.emit('earley_column', position=j, items=len(items), completed=completed)
+            cells += len(items)
+
+        root = None
+        for r in rules_by_lhs.get(self.start_symbol, []):
+            item = (r, len(rules[r][1]), 0)
+            if item in chart[n]:
+                root = item
+                break
+
+        end_time = time.time()
+        elapsed = end_time - start_time
+        accepted = root is not None
+
+        if trace:
+            self.events.emit('parse_finished', accepted=accepted, elapsed=elapsed)
+
+        return accepted, elapsed, {'chart': chart, 'root': root, 'words': words}
+
+    def build_parse_tree(self, parse_data: dict) -> Optional[dict]:
+        """
+        Construye el árbol de parsing (sobre los no-terminales originales)
+        siguiendo los backpointers del chart de Earley.
+        """
+        if parse_data is None or parse_data['root'] is None:
+            return None
+        return self._item_tree(parse_data, parse_data['root'], len(parse_data['words']))
+
+    def _item_tree(self, parse_data: dict, item: Tuple[int, int, int], end: int) -> dict:
+        """
+        Construye el subárbol de un ítem completo que termina en `end`.
+        Los hijos completados se encolan en una pila explícita en lugar de
+        recursión, así que la profundidad del árbol no está limitada.
+        """
+        root = [None]
+        stack = [(item, end, root, 0)]
+        while stack:
+            item, end, slot, index = stack.pop()
+            slot[index] = self._item_node(parse_data, item, end, stack)
+        return root[0]
+
+    def _item_node(self, parse_data: dict, item: Tuple[int, int, int], end: int, stack: list) -> dict:
+        """
+        Nodo de un ítem completo; deja en `stack` las tareas de sus hijos completados.
+        """
+        chart = parse_data['chart']
+        words = parse_data['words']
+        r, dot, origin = item
+        lhs, symbols = self.rules[r]
+
+        # Regla preterminal A -> a: hoja con el mismo formato que CYKParser
+        if len(symbols) == 1 and symbols[0] not in self.rules_by_lhs:
+            return {'symbol': lhs, 'type': 'terminal', 'value': words[origin], 'span': (origin, end)}
+        if not symbols:
+            return {'symbol': lhs, 'type': 'terminal', 'value': 'ε', 'span': (origin, origin)}
+
+        children = []
+        completed = []  # (ítem hijo, fin, posición desde el final)
+        pos = end
+        while dot > 0:
+            backpointer = chart[pos][(r, dot, origin)]
+            kind = backpointer[0]
+            if kind == 'scan':
+                word = words[pos - 1]
+                children.append({'symbol': word, 'type': 'terminal', 'value': word, 'span': (pos - 1, pos)})
+                pos -= 1
+            elif kind == 'complete':
+                child = backpointer[2]
+                completed.append((child, pos, len(children)))
+                children.append(None)
+                pos = child[2]
+            else:
+                children.append(self._null_tree(symbols[dot - 1], pos))
+            dot -= 1
+
+        children.reverse()
+        last = len(children) - 1
+        for child, child_end, position in completed:
+            stack.append((child, child_end, children, last - position))
+        return {'symbol': lhs, 'type': 'nonterminal', 'children': children, 'span': (origin, end)}
+
+    def _null_tree(self, symbol: str, pos: int) -> dict:
+        """
+        Construye la derivación ε de un símbolo anulable en la posición `pos`.
+        """
+        r = self.null_rule[symbol]
+        lhs, symbols = self.rules[r]
+        if not symbols:
+            return {'symbol': lhs, 'type': 'terminal', 'value': 'ε', 'span': (pos, pos)}
+        return {
+            'symbol': lhs,
+            'type': 'nonterminal',
+            'children': [self._null_tree(s, pos) for s in symbols],
+            'span': (pos, pos)
+        }
+
+    # Los árboles y los parses abortados comparten el formato de CYKParser
+    _abort = CYKParser._abort
+    save_parse_tree = CYKParser.save_parse_tree
+    print_parse_tree = CYKParser.print_parse_tree
+    save_parse_tree_graphviz = CYKParser.save_parse_tree_graphviz
+
+
+def grammar_characteristics(converter: CNFConverter) -> dict:
+    """
+    Mide las características de la gramática que determinan qué motor conviene:
+    tamaño antes/después de CNF, anulables, unitarias y conflictos de FIRST.
+    """
+    names = converter.symbols.names
+    split_prods = {
+        names[nt]: [tuple(names[s] for s in prod) for prod in prods]
+        for nt, prods in converter.rules.items()
+    }
+    nonterminals = set(split_prods)
+
+    original_rules = sum(len(prods) for prods in split_prods.values())
+    unit_rules = sum(
+        1 for prods in split_prods.values() for symbols in prods
+        if len(symbols) == 1 and symbols[0] in nonterminals
+    )
+
+    earley = EarleyParser(silent=True)
+    earley.load_from_converter(converter)
+    nullable = earley.nullable
+
+    # Conjuntos FIRST para estimar cuán determinista es la gramática
+    first = {nt: set() for nt in nonterminals}
+    changed = True
+    while changed:
+        changed = False
+        for nt, prods in split_prods.items():
+            for symbols in prods:
+                for s in symbols:
+                    new = first[s] if s in nonterminals else {s}
+                    if not new <= first[nt]:
+                        first[nt] |= new
+                        changed = True
+                    if s not in nullable:
+                        break
+
+    conflicts = 0
+    for nt, prods in split_prods.items():
+        seen = set()
+        for symbols in prods:
+            prod_first = set()
+            for s in symbols:
+                prod_first |= first[s] if s in nonterminals else {s}
+                if s not in nullable:
+                    break
+            if prod_first & seen:
+                conflicts += 1
+                break
+            seen |= prod_first
+
+    # Tamaño de la gramática en CNF (sobre una copia para no alterar el original)
+    cnf = converter.copy()
+    cnf.remove_epsilon_productions()
+    cnf.remove_unit_productions()
+    cnf.remove_useless_symbols()
+    cnf.convert_to_cnf()
+    cnf_rules = cnf.count_rules()
+
+    return {
+        'original_rules': original_rules,
+        'original_nonterminals': len(nonterminals),
+        'cnf_rules': cnf_rules,
+        'cnf_nonterminals': len(cnf.rules),
+        'blowup': cnf_rules / original_rules if original_rules else 0.0,
+        'nullable': len(nullable),
+        'unit_rules': unit_rules,
+        'first_conflict_ratio': conflicts / len(nonterminals) if nonterminals else 0.0,
+        'cnf_converter': cnf
+    }
+
+
+def create_parser(converter: CNFConverter, mode: str = 'auto',
+                  sample_sentences: Optional[List[str]] = None):
+    """
+    Crea el motor de parsing para la gramática cargada en `converter`.
+
+    mode: 'earley', 'cyk' o 'auto'. En modo 'auto' se elige por gramática:
+    si se dan oraciones de muestra se cronometran ambos motores y gana el más
+    rápido; si no, se usa Earley cuando la gramática es casi determinista o
+    cuando la conversión a CNF la infla demasiado.
+
+    Retorna: (parser, información de la selección: dict)
+    """
+    if mode not in ('auto', 'earley', 'cyk'):
+        raise ValueError(f"Modo de parsing desconocido: {mode}")
+
+    info = {'mode': mode}
+    engines = {}
+
+    if mode in ('auto', 'cyk'):
+        info.update(grammar_characteristics(converter))
+        cnf = info.pop('cnf_converter')
+        cyk = CYKParser(silent=True)
+        cyk.load_compiled(cnf.compile())
+        # El parser resultante reporta por el mismo canal que el convertidor
+        cyk.events = converter.events
+        engines['cyk'] = cyk
+
+    if mode in ('auto', 'earley'):
+        earley = EarleyParser(events=converter.events)
+        earley.load_from_converter(converter)
+        engines['earley'] = earley
+
+    if mode != 'auto':
+        info['engine'] = mode
+        return engines[mode], info
+
+    if sample_sentences:
+        timings = {}
+        for name, engine in engines.items():
+            timings[name] = sum(engine.parse(s, verbose=False)[1] for s in sample_sentences)
+        info['timings'] = timings
+        info['engine'] = min(timings, key=timings.get)
+    elif info['first_conflict_ratio'] <= 0.25 or info['blowup'] >= 2.0:
+        info['engine'] = 'earley'
+    else:
+        info['engine'] = 'cyk'
+
+    return engines[info['engine']], info
@@ -0,0 +1,611 @@
+"""
+Proyecto 2 - Edición incremental de gramáticas
+Teoría de la Computación
+Agrega o elimina producciones de la CFG original y recalcula solo la parte
+afectada de la conversión a CNF, parchando el CYKParser en su lugar.
+"""
+
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from cyk_parser import CNFConverter, CYKParser
+
+
+# Cambio de las producciones de un no-terminal: (agregadas, eliminadas)
+Delta = Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]
+
+
+class _SymbolIndex:
+    """
+    Índice de uso de símbolos: qué no-terminales mencionan cada símbolo en
+    alguna de sus producciones (con conteo para soportar eliminaciones).
+    """
+
+    def __init__(self):
+        self.uses = defaultdict(dict)  # no-terminal -> {símbolo: producciones que lo usan}
+        self.users = defaultdict(set)  # símbolo -> {no-terminales}
+
+    def update(self, nt: int, added: Iterable, removed: Iterable):
+        uses = self.uses[nt]
+        for prod in added:
+            for s in set(prod):
+                if s not in uses:
+                    uses[s] = 0
+                    self.users[s].add(nt)
+                uses[s] += 1
+        for prod in removed:
+            for s in set(prod):
+                uses[s] -= 1
+                if not uses[s]:
+                    del uses[s]
+                    self.users[s].discard(nt)
+
+    def users_of(self, symbols: Iterable[int]) -> Set[int]:
+        result = set()
+        for s in symbols:
+            result |= self.users.get(s, set())
+        return result
+
+
+def _diff(old: dict, new: dict) -> Delta:
+    """
+    Producciones agregadas y eliminadas entre dos versiones de un no-terminal.
+    """
+    return [prod for prod in new if prod not in old], [prod for prod in old if prod not in new]
+
+
+def _derivable(grammar: dict, users: Dict[int, Set[int]], base,
+               result: Optional[Set[int]] = None, pending: Optional[List[int]] = None) -> Set[int]:
+    """
+    No-terminales con alguna producción cuyos símbolos están todos en `base`
+    o son a su vez derivables (anulables con base vacía, generadores con los
+    terminales). Un no-terminal se vuelve a revisar solo cuando alguno de los
+    símbolos que usa pasa a ser derivable. Con `result` y `pending` se extiende
+    un resultado previo a partir de los no-terminales pendientes.
+    """
+    result = set() if result is None else result
+    pending = list(grammar) if pending is None else pending
+    while pending:
+        nt = pending.pop()
+        if nt in result or nt not in grammar:
+            continue
+        for prod in grammar[nt]:
+            if all(s in base or s in result for s in prod):
+                result.add(nt)
+                pending.extend(users.get(nt, ()))
+                break
+    return result
+
+
+def _rederive(grammar: dict, users: Dict[int, Set[int]], base, previous: Set[int],
+              changed: Iterable[int]) -> Set[int]:
+    """
+    Actualiza un resultado de _derivable tras cambiar las producciones de
+    `changed`: se retira lo que pudo depender de ellos (y de quienes los usan)
+    y se vuelve a derivar solo esa parte.
+    """
+    result = set(previous)
+    lost = set()
+    pending = list(changed)
+    while pending:
+        nt = pending.pop()
+        if nt in lost:
+            continue
+        lost.add(nt)
+        pending.extend(u for u in users.get(nt, ()) if u in result)
+    result -= lost
+    return _derivable(grammar, users, base, result=result, pending=list(lost))
+
+
+class _Tracker:
+    """
+    Registra el estado original de las producciones tocadas durante una
+    actualización para reportar solo el cambio neto de cada no-terminal.
+    """
+
+    def __init__(self):
+        self.touched = {}  # no-terminal -> {producción: estaba presente}
+
+    def mark(self, nt: int, prod: Tuple[int, ...], present: bool):
+        self.touched.setdefault(nt, {}).setdefault(prod, present)
+
+    def changes(self, grammar: dict) -> Dict[int, Delta]:
+        result = {}
+        for nt, prods in self.touched.items():
+            current = grammar.get(nt, {})
+            added = [prod for prod, was in prods.items() if not was and prod in current]
+            removed = [prod for prod, was in prods.items() if was and prod not in current]
+            if added or removed:
+                result[nt] = (added, removed)
+        return result
+
+
+class _UnitClosure:
+    """
+    Eliminación incremental de producciones unitarias. Guarda el grafo A -> [B]
+    y su inverso: si cambian las unitarias de un no-terminal se recalcula la
+    clausura de todo lo que lo alcanza; si solo cambian producciones no
+    unitarias, el cambio se propaga tal cual a quienes lo alcanzan.
+    """
+
+    def __init__(self):
+        self.targets = {}  # A -> [B] con A -> B unitaria
+        self.sources = defaultdict(set)  # B -> {A}
+        self.reach = {}  # A -> no-terminales alcanzables por unitarias
+        self.result = {}  # A -> producciones sin unitarias
+
+    def _reaching(self, roots: Iterable[int]) -> Set[int]:
+        """
+        Los no-terminales dados y todos los que los alcanzan por unitarias.
+        """
+        found = set()
+        pending = list(roots)
+        while pending:
+            b = pending.pop()
+            if b not in found:
+                found.add(b)
+                pending.extend(self.sources.get(b, ()))
+        return found
+
+    def update(self, grammar: dict, is_unit, changes: Dict[int, Delta],
+               force: Set[int] = frozenset()) -> Dict[int, Delta]:
+        """
+        Aplica los cambios de `grammar` (y recalcula por completo `force`).
+
+        Retorna: dict no-terminal -> (agregadas, eliminadas) de la clausura
+        """
+        rebuild = set(force)
+        for nt, (added, removed) in changes.items():
+            old_targets = self.targets.get(nt, ())
+            if (nt not in grammar or nt not in self.result or any(is_unit(prod) for prod in added)
+                    or any(len(prod) == 1 and prod[0] in old_targets for prod in removed)):
+                rebuild.add(nt)
+
+        for nt in rebuild:
+            for b in self.targets.pop(nt, ()):
+                self.sources[b].discard(nt)
+            targets = [prod[0] for prod in grammar.get(nt, ()) if is_unit(prod)]
+            if targets:
+                self.targets[nt] = targets
+                for b in targets:
+                    self.sources[b].add(nt)
+
+        modified = {}
+        full = self._reaching(rebuild)
+        for nt in full:
+            old = self.result.pop(nt, {})
+            self.reach.pop(nt, None)
+            if nt in grammar:
+                reached = {}
+                pending = list(self.targets.get(nt, ()))
+                while pending:
+                    b = pending.pop()
+                    if b in reached:
+                        continue
+                    reached[b] = None
+                    pending.extend(self.targets.get(b, ()))
+
+                new_prods = {prod: None for prod in grammar[nt] if not is_unit(prod)}
+                for b in reached:
+                    for prod in grammar.get(b, ()):
+                        if not is_unit(prod):
+                            new_prods[prod] = None
+                self.result[nt] = new_prods
+                self.reach[nt] = reached
+            else:
+                new_prods = {}
+            delta = _diff(old, new_prods)
+            if delta[0] or delta[1]:
+                modified[nt] = delta
+
+        # Cambios que no tocan unitarias: se propagan sin recalcular la clausura
+        tracker = _Tracker()
+        for b, (added, removed) in changes.items():
+            if b in rebuild:
+                continue
+            for nt in self._reaching([b]):
+                if nt in full:
+                    continue
+                prods = self.result[nt]
+                for prod in added:
+                    if prod not in prods:
+                        tracker.mark(nt, prod, False)
+                        prods[prod] = None
+                for prod in removed:
+                    if prod in prods and prod not in grammar.get(nt, ()) and not any(
+                            prod in grammar.get(c, ()) for c in self.reach[nt]):
+                        tracker.mark(nt, prod, True)
+                        del prods[prod]
+        modified.update(tracker.changes(self.result))
+        return modified
+
+
+class GrammarEditor:
+    """
+    Edición incremental sobre un par convertidor/parser vivo.
+
+    Mantiene la CFG original y el resultado de cada etapa de la conversión
+    (eliminación de ε, clausura unitaria, símbolos útiles, binarización y
+    unitarias finales). Cada edición se propaga como cambios por no-terminal:
+    solo se recalcula lo que depende de ellos y terminal_rules /
+    nonterminal_rules del parser se parchan en su lugar. El lenguaje resultante
+    es el mismo que el de full_conversion sobre la gramática editada; los
+    nombres de los no-terminales auxiliares (T*, Y*) pueden diferir.
+    """
+
+    def __init__(self, converter: CNFConverter, parser: Optional[CYKParser] = None):
+        """
+        converter: CNFConverter con la gramática CFG ya cargada (sin convertir).
+        parser: CYKParser a mantener sincronizado (se crea uno si no se da).
+        """
+        self.converter = converter
+        self.parser = parser if parser is not None else CYKParser(events=converter.events)
+        self.events = converter.events
+        self.symbols = converter.symbols
+        self.start = self.symbols.intern(converter.start_symbol)
+
+        # CFG original y clasificación de sus símbolos (como en load_grammar)
+        self.source = {nt: dict(prods) for nt, prods in converter.rules.items()}
+        self.source_nonterminals = set(converter.nonterminal_ids)
+        self.source_terminals = set(converter.terminal_ids)
+        self.source_index = _SymbolIndex()
+        self.order = {}  # posición de cada no-terminal (orden de procesamiento de convert_to_cnf)
+        for nt, prods in self.source.items():
+            self.order[nt] = len(self.order)
+            self.source_index.update(nt, prods, ())
+
+        # Resultado de cada etapa
+        self.nullable = set()
+        self.expanded = {}
+        self.units = _UnitClosure()
+        self.closed_index = _SymbolIndex()
+        self.generating = set()
+        self.useful = set()
+        self.cnf = {}
+        self.cnf_index = _SymbolIndex()
+        self.final_units = _UnitClosure()
+
+        # No-terminales auxiliares de la binarización, compartidos y con conteo de referencias
+        self.helpers = {}  # terminal o par de símbolos -> no-terminal auxiliar
+        self.helper_keys = {}  # no-terminal auxiliar -> clave
+        self.helper_refs = {}  # no-terminal auxiliar -> referencias
+        self.next_index = 0
+        self._cnf_tracker = _Tracker()
+        self._helpers_touched = set()
+
+        self._recompile(set(self.source), set())
+
+        # El convertidor pasa a contener la gramática en CNF (sin minimizar)
+        converter.rules = self.final_units.result
+        converter.terminal_ids = self.source_terminals
+        converter.nonterminal_ids = self.useful | set(self.helper_keys)
+        converter.symbol_map = {}
+        converter.merged_symbols = {}
+        converter.unminimized_rules = {}
+        self.rule_count = converter.count_rules()
+        self.parser.load_compiled(converter.compile())
+
+    def add_production(self, left: str, production: str) -> dict:
+        """
+        Agrega una producción (misma sintaxis que el archivo: "NP VP", "ε").
+        """
+        return self.apply(added=[(left, production)])
+
+    def remove_production(self, left: str, production: str) -> dict:
+        """
+        Elimina una producción de la gramática original.
+        """
+        return self.apply(removed=[(left, production)])
+
+    def apply(self, added: Iterable[Tuple[str, str]] = (),
+              removed: Iterable[Tuple[str, str]] = ()) -> dict:
+        """
+        Aplica un lote de ediciones (left, producción) y sincroniza el parser.
+
+        Retorna: dict con los no-terminales de la CNF que cambiaron ('changed'),
+        reglas agregadas/eliminadas y tiempo; sirve para invalidar cachés.
+        """
+        start_time = time.perf_counter()
+        intern = self.symbols.intern
+        edited = set()
+        touched = set()
+
+        for left, production in removed:
+            left_id = intern(left)
+            prod = self._production_ids(production)
+            prods = self.source.get(left_id)
+            if prods is None or prod not in prods:
+                continue
+            del prods[prod]
+            self.source_index.update(left_id, (), [prod])
+            if not prods:
+                del self.source[left_id]
+            edited.add(left_id)
+            touched.add(left_id)
+            touched.update(prod)
+
+        for left, production in added:
+            left_id = intern(left)
+            prod = self._production_ids(production)
+            prods = self.source.setdefault(left_id, {})
+            self.order.setdefault(left_id, len(self.order))
+            if prod in prods:
+                continue
+            prods[prod] = None
+            self.source_index.update(left_id, [prod], ())
+            edited.add(left_id)
+            touched.add(left_id)
+            touched.update(prod)
+
+        reclassified = {s for s in touched if self._classify(s)}
+        changes = self._recompile(edited, reclassified)
+        self.converter.nonterminal_ids = self.useful | set(self.helper_keys)
+
+        # Parchar el parser solo en los no-terminales que cambiaron
+        names = self.symbols.names
+
+        def render(prod):
+            return [names[s] for s in prod] if prod else ['ε']
+
+        rules_added = 0
+        rules_removed = 0
+        for nt, (added_prods, removed_prods) in changes.items():
+            rules_added += len(added_prods)
+            rules_removed += len(removed_prods)
+            self.parser.patch_rules(names[nt], added=[render(prod) for prod in added_prods],
+                                    removed=[render(prod) for prod in removed_prods])
+
+        self.rule_count += rules_added - rules_removed
+
+        report = {
+            'changed': sorted(names[nt] for nt in changes),
+            'rules_added': rules_added,
+            'rules_removed': rules_removed,
+            'nonterminals': len(self.converter.rules),
+            'rules': self.rule_count,
+            'elapsed': time.perf_counter() - start_time
+        }
+        if self.events.enabled:
+            self.events.emit('grammar_patched', **report)
+        return report
+
+    def _production_ids(self, production: str) -> Tuple[int, ...]:
+        """
+        Tokeniza una producción como load_grammar y la convierte a IDs.
+        """
+        symbols = self.converter.tokenize_production(production.strip())
+        if symbols == ['ε']:
+            return ()
+        return tuple(self.symbols.intern(s) for s in symbols)
+
+    def _classify(self, s: int) -> bool:
+        """
+        Reclasifica un símbolo tocado por una edición con las reglas de
+        load_grammar. Retorna True si su clasificación cambió.
+        """
+        name = self.symbols.names[s]
+        used = bool(self.source_index.users.get(s))
+        single_upper = len(name) == 1 and name[0].isupper()
+        is_nonterminal = s in self.source or (used and single_upper)
+        is_terminal = used and not single_upper and name not in ('ε', 'e')
+
+        changed = False
+        for flag, ids in ((is_nonterminal, self.source_nonterminals), (is_terminal, self.source_terminals)):
+            if flag != (s in ids):
+                if flag:
+                    ids.add(s)
+                else:
+                    ids.discard(s)
+                changed = True
+        return changed
+
+    def _recompile(self, edited: Set[int], reclassified: Set[int]) -> Dict[int, Delta]:
+        """
+        Propaga las ediciones por las etapas de la conversión. Los puntos fijos
+        globales (anulables, generadores, alcanzables) se recalculan con listas
+        de trabajo; solo sus diferencias obligan a recalcular por completo un
+        no-terminal, el resto de las etapas recibe únicamente los cambios.
+
+        Retorna: dict no-terminal de la CNF -> (agregadas, eliminadas)
+        """
+        # Etapa 1: anulables y eliminación de producciones-ε
+        nullable = _rederive(self.source, self.source_index.users, frozenset(), self.nullable, edited)
+        dirty = edited | self.source_index.users_of((nullable ^ self.nullable) | reclassified)
+        self.nullable = nullable
+
+        expanded_changes = {}
+        for nt in dirty:
+            old = self.expanded.pop(nt, {})
+            new = self._expand(nt) if nt in self.source else {}
+            if new:
+                self.expanded[nt] = new
+            delta = _diff(old, new)
+            if delta[0] or delta[1]:
+                expanded_changes[nt] = delta
+
+        # Etapa 2: producciones unitarias (la reclasificación cambia qué es unitaria)
+        source_nonterminals = self.source_nonterminals
+        closed_changes = self.units.update(
+            self.expanded, lambda prod: len(prod) == 1 and prod[0] in source_nonterminals,
+            expanded_changes, force=self.source_index.users_of(reclassified)
+        )
+        closed = self.units.result
+        for nt, (added, removed) in closed_changes.items():
+            self.closed_index.update(nt, added, removed)
+
+        # Etapa 3: símbolos útiles (generadores ∩ alcanzables)
+        terminals = self.source_terminals
+        closed_users = self.closed_index.users
+        self.generating = _rederive(closed, closed_users, terminals, self.generating,
+                                    set(closed_changes) | self.closed_index.users_of(reclassified))
+        reachable = {self.start}
+        pending = [self.start]
+        while pending:
+            nt = pending.pop()
+            if nt not in closed:
+                continue
+            for s in self.closed_index.uses.get(nt, ()):
+                if s in source_nonterminals and s not in reachable:
+                    reachable.add(s)
+                    pending.append(s)
+        useful = self.generating & reachable
+        useful_changed = useful ^ self.useful
+        self.useful = useful
+
+        # Etapa 4: binarización. Se recalcula por completo lo que depende de
+        # un símbolo que cambió de utilidad o de clase; el resto recibe los
+        # cambios (en el orden de la gramática, como convert_to_cnf).
+        changed_symbols = useful_changed | reclassified
+        rebuild = useful_changed | self.closed_index.users_of(changed_symbols)
+        for nt, (_, removed) in closed_changes.items():
+            if any(s in changed_symbols for prod in removed for s in prod):
+                rebuild.add(nt)
+        self._cnf_tracker = _Tracker()
+        self._helpers_touched = set()
+
+        # Un no-terminal nuevo con el nombre de un auxiliar (p. ej. T5): los
+        # dueños del auxiliar se reconstruyen y este se recrea con otro nombre
+        for helper in reclassified & set(self.helper_keys):
+            owners = set()
+            pending = [helper]
+            seen = {helper}
+            while pending:
+                for nt in self.cnf_index.users.get(pending.pop(), ()):
+                    if nt not in self.helper_keys:
+                        owners.add(nt)
+                    elif nt not in seen:
+                        seen.add(nt)
+                        pending.append(nt)
+            for nt in owners:
+                for prod in list(self.cnf.get(nt, ())):
+                    self._remove_cnf(nt, prod)
+            rebuild |= owners
+        for nt in sorted(rebuild, key=self.order.__getitem__):
+            old = self.cnf.get(nt, {})
+            new = {}
+            if nt in useful:
+                new = {
+                    self._binarize(prod): None for prod in closed.get(nt, ())
+                    if prod and all(s in terminals or s in useful for s in prod)
+                }
+            for prod in new:
+                if prod not in old:
+                    self._add_cnf(nt, prod)
+            for prod in list(old):
+                if prod not in new:
+                    self._remove_cnf(nt, prod)
+
+        for nt, (added, removed) in closed_changes.items():
+            if nt in rebuild or nt not in useful:
+                continue
+            for prod in added:
+                if prod and all(s in terminals or s in useful for s in prod):
+                    self._add_cnf(nt, self._binarize(prod))
+            for prod in removed:
+                if prod and all(s in terminals or s in useful for s in prod):
+                    self._remove_cnf(nt, self._binarize(prod))
+
+        cnf_changes = self._cnf_tracker.changes(self.cnf)
+        for nt, (added, removed) in cnf_changes.items():
+            self.cnf_index.update(nt, added, removed)
+
+        # Unitarias creadas por la conversión (p. ej. T -> Expr)
+        helper_keys = self.helper_keys
+        return self.final_units.update(
+            self.cnf, lambda prod: len(prod) == 1 and (prod[0] in useful or prod[0] in helper_keys),
+            cnf_changes, force=self.cnf_index.users_of(useful_changed | self._helpers_touched)
+        )
+
+    def _expand(self, nt: int) -> dict:
+        """
+        Producciones de un no-terminal sin ε (igual que remove_epsilon_productions).
+        """
+        nullable = self.nullable
+        new_prods = {}
+        for prod in self.source[nt]:
+            if not prod:
+                if nt == self.start:
+                    new_prods[()] = None
+                continue
+
+            nullable_positions = [i for i, s in enumerate(prod) if s in nullable]
+            for mask in range(1 << len(nullable_positions)):
+                omitted = {pos for b, pos in enumerate(nullable_positions) if mask & (1 << b)}
+                new_prod = tuple(s for i, s in enumerate(prod) if i not in omitted)
+                if new_prod:
+                    new_prods[new_prod] = None
+                elif nt == self.start:
+                    new_prods[()] = None
+        return new_prods
+
+    def _binarize(self, prod: Tuple[int, ...]) -> Tuple[int, ...]:
+        """
+        Lleva una producción a CNF (igual que convert_to_cnf), reutilizando
+        los no-terminales auxiliares existentes.
+        """
+        terminals = self.source_terminals
+        if len(prod) == 1 and prod[0] in terminals:
+            return prod
+        if len(prod) == 2 and all(s in self.useful or s in self.helper_keys for s in prod):
+            return prod
+
+        symbols = [self._helper(s, 'T', (s,)) if s in terminals else s for s in prod]
+        while len(symbols) > 2:
+            last_two = tuple(symbols[-2:])
+            symbols[-2:] = [self._helper(last_two, 'Y', last_two)]
+        return tuple(symbols)
+
+    def _helper(self, key, base: str, production: Tuple[int, ...]) -> int:
+        """
+        Obtiene o crea el no-terminal auxiliar para un terminal o un par de símbolos.
+        """
+        helper = self.helpers.get(key)
+        if helper is None:
+            while True:
+                name = f"{base}{self.next_index}"
+                self.next_index += 1
+                helper = self.symbols.intern(name)
+                if (helper not in self.source_nonterminals and helper not in self.cnf
+                        and helper not in self.helper_keys):
+                    break
+            self.helpers[key] = helper
+            self.helper_keys[helper] = key
+            self.helper_refs[helper] = 0
+            self._helpers_touched.add(helper)
+            self._add_cnf(helper, production)
+        return helper
+
+    def _add_cnf(self, nt: int, prod: Tuple[int, ...]):
+        """
+        Agrega una producción en CNF y cuenta sus referencias a auxiliares.
+        """
+        prods = self.cnf.setdefault(nt, {})
+        if prod in prods:
+            return
+        self._cnf_tracker.mark(nt, prod, False)
+        prods[prod] = None
+        for s in prod:
+            if s in self.helper_refs:
+                self.helper_refs[s] += 1
+
+    def _remove_cnf(self, nt: int, prod: Tuple[int, ...]):
+        """
+        Elimina una producción en CNF; los auxiliares que quedan sin uso se eliminan.
+        """
+        prods = self.cnf.get(nt)
+        if not prods or prod not in prods:
+            return
+        self._cnf_tracker.mark(nt, prod, True)
+        del prods[prod]
+        if not prods:
+            del self.cnf[nt]
+        for s in prod:
+            if s in self.helper_refs:
+                self.helper_refs[s] -= 1
+                if not self.helper_refs[s]:
+                    del self.helpers[self.helper_keys.pop(s)]
+                    del self.helper_refs[s]
+                    self._helpers_touched.add(s)
+                    for own in list(self.cnf.get(s, ())):
+                        self._remove_cnf(s, own)
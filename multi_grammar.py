@@ -0,0 +1,193 @@
+"""
+Proyecto 2 - Validación contra varias gramáticas en una sola pasada
+Teoría de la Computación
+Combina varias gramáticas en CNF en un único índice con espacios de nombres
+y llena una sola tabla CYK para decidir, por gramática, si la oración pertenece.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+from cyk_parser import CYKParser, EventEmitter, ParseBudget, ParseChart, equivalent_nonterminals, make_events
+
+
+class MultiGrammarParser:
+    """
+    Índice combinado de varias gramáticas en CNF. Cada no-terminal se renombra
+    como 'nombre:NT'; los terminales se comparten. Los no-terminales
+    equivalentes entre gramáticas (equivalent_nonterminals, el mismo
+    refinamiento que usa CNFConverter.minimize_cnf) se fusionan, así que las
+    sub-gramáticas comunes se calculan una sola vez por celda.
+    """
+
+    def __init__(self, silent: bool = False, events: Optional[EventEmitter] = None):
+        self.sources = {}  # Dict[str, Tuple[Dict[str, List[List[str]]], str]] - nombre -> (gramática, inicial)
+        self.symbol_map = {}  # Dict[str, str] - 'nombre:NT' -> no-terminal en el índice combinado
+        self.parser = CYKParser(silent=True)
+        self.events = make_events(silent, events)
+        self._dirty = False
+
+    @property
+    def grammars(self) -> Dict[str, str]:
+        """
+        Símbolo inicial de cada gramática dentro del índice combinado.
+        """
+        self._build()
+        return {name: self.symbol_map[f"{name}:{start}"] for name, (_, start) in self.sources.items()}
+
+    def add_grammar(self, name: str, parser: CYKParser):
+        """
+        Agrega (o reemplaza) la gramática indexada en un CYKParser.
+        """
+        if ':' in name:
+            raise ValueError(f"El nombre de la gramática no puede contener ':': {name}")
+        grammar = {left: [list(symbols) for symbols in prods] for left, prods in parser.grammar.items()}
+        self.sources[name] = (grammar, parser.start_symbol)
+        self._dirty = True
+
+    def load_cnf_grammar(self, name: str, filename: str) -> bool:
+        """
+        Carga una gramática en CNF desde un archivo con el nombre dado.
+        """
+        parser = CYKParser(events=self.events)
+        if not parser.load_cnf_grammar(filename):
+            return False
+        self.add_grammar(name, parser)
+        return True
+
+    def load_compiled(self, name: str, compiled: dict) -> bool:
+        """
+        Agrega el resultado de CNFConverter.compile() con el nombre dado.
+        """
+        parser = CYKParser(silent=True)
+        parser.load_compiled(compiled)
+        self.add_grammar(name, parser)
+        return True
+
+    def remove_grammar(self, name: str):
+        """
+        Quita una gramática del índice combinado.
+        """
+        del self.sources[name]
+        self._dirty = True
+
+    def symbol(self, name: str, nonterminal: str) -> str:
+        """
+        Nombre en el índice combinado (y en la tabla) de un no-terminal de una gramática.
+        """
+        self._build()
+        return self.symbol_map[f"{name}:{nonterminal}"]
+
+    def _build(self):
+        """
+        Reconstruye el índice combinado si cambiaron las gramáticas.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        # Renombrar los no-terminales; las producciones de un símbolo son
+        # terminales (CYK las busca por palabra): su símbolo es la tupla (palabra,)
+        # para que ninguna palabra se confunda con un no-terminal renombrado
+        combined = {}
+        starts = set()
+        for name, (grammar, start) in self.sources.items():
+            starts.add(f"{name}:{start}")
+            for left, prods in grammar.items():
+                combined[f"{name}:{left}"] = [
+                    (tuple(symbols),) if len(symbols) == 1 else tuple(f"{name}:{s}" for s in symbols)
+                    for symbols in prods
+                ]
+
+        # Representante: un símbolo inicial, luego los originales (no T*/X*/Y*), luego alfabético
+        def preference(nt):
+            local = nt.split(':', 1)[1]
+            return (nt not in starts, re.fullmatch(r'[TXY]\d+', local) is not None, nt)
+
+        _, self.symbol_map = equivalent_nonterminals(combined, lambda s: s, preference)
+
+        grammar = {}
+        terminal_rules = {}
+        nonterminal_rules = {}
+        for nt, prods in combined.items():
+            left = self.symbol_map[nt]
+            if left != nt:
+                continue
+            symbol_lists = grammar[left] = []
+            for prod in dict.fromkeys(
+                prod[0] if len(prod) == 1 else tuple(self.symbol_map.get(s, s) for s in prod) for prod in prods
+            ):
+                symbol_lists.append(list(prod))
+                if len(prod) == 1:
+                    terminal_rules.setdefault(prod[0], []).append(left)
+                elif len(prod) == 2:
+                    nonterminal_rules.setdefault(prod, []).append(left)
+
+        start_symbol = self.symbol_map[min(starts)] if starts else 'S'
+        self.parser.load_compiled({
+            'grammar': grammar,
+            'terminal_rules': terminal_rules,
+            'nonterminal_rules': nonterminal_rules,
+            'start_symbol': start_symbol
+        })
+
+    def parse(self, sentence: str, verbose: bool = False, sparse: bool = True,
+              budget: Optional[ParseBudget] = None) -> Tuple[Dict[str, Optional[bool]], float, Optional[ParseChart]]:
+        """
+        Llena una sola tabla CYK con el índice combinado y revisa el símbolo
+        inicial de cada gramática. Por defecto usa parse_sparse, que solo combina
+        pares de no-terminales de reglas existentes (sin cruzar gramáticas).
+
+        Retorna: (veredicto por gramática: dict, tiempo: float, tabla: ParseChart)
+        Si el presupuesto se agota, cada veredicto es None.
+        """
+        self._build()
+        start_time = time.time()
+        parse = self.parser.parse_sparse if sparse else self.parser.parse
+        accepted, _, chart = parse(sentence, verbose=False, budget=budget)
+
+        if chart is None:
+            results = {name: False for name in self.sources}
+        elif accepted is None:
+            results = {name: None for name in self.sources}
+        else:
+            results = {name: chart.accepts(start) for name, start in self.grammars.items()}
+        elapsed = time.time() - start_time
+
+        if verbose and self.events.enabled:
+            self.events.emit('grammars_checked', sentence=sentence, results=results, elapsed=elapsed)
+        return results, elapsed, chart
+
+    def build_parse_tree(self, chart: ParseChart, name: str) -> Optional[dict]:
+        """
+        Árbol de derivación para la gramática `name` (etiquetas del índice combinado).
+        """
+        return chart.tree(self.grammars[name])
+
+
+def main():
+    """
+    Uso: python multi_grammar.py gramatica1_cnf.txt gramatica2_cnf.txt ... < oraciones.txt
+    """
+    arg_parser = argparse.ArgumentParser(description="Valida oraciones contra varias gramáticas CNF a la vez")
+    arg_parser.add_argument('grammars', nargs='+', help="Gramáticas en CNF (el nombre es el del archivo)")
+    args = arg_parser.parse_args()
+
+    multi = MultiGrammarParser()
+    for filename in args.grammars:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        if not multi.load_cnf_grammar(name, filename):
+            return
+
+    for line in sys.stdin:
+        sentence = line.strip()
+        if sentence:
+            multi.parse(sentence, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
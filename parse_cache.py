@@ -0,0 +1,256 @@
+"""
+Proyecto 2 - Caché de resultados de parsing
+Teoría de la Computación
+Memoriza el veredicto de oraciones completas (y opcionalmente el árbol)
+con un LRU acotado en memoria y una capa persistente opcional en SQLite.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from cyk_parser import CYKParser
+
+
+# Costo fijo aproximado (en bytes) de cada entrada del LRU además de su contenido
+ENTRY_OVERHEAD = 64
+
+
+def grammar_fingerprint(parser: CYKParser) -> str:
+    """
+    Hash estable de la gramática indexada en el parser (símbolo inicial y reglas).
+    """
+    h = hashlib.sha1()
+    h.update(parser.start_symbol.encode('utf-8'))
+    for terminal in sorted(parser.terminal_rules):
+        h.update(f"\x1e{terminal}->{','.join(sorted(parser.terminal_rules[terminal]))}".encode('utf-8'))
+    for (B, C) in sorted(parser.nonterminal_rules):
+        h.update(f"\x1e{B} {C}->{','.join(sorted(parser.nonterminal_rules[(B, C)]))}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def _restore_span(node: dict) -> dict:
+    """
+    object_hook de json.loads: JSON guarda los spans como listas; se vuelven
+    tuplas para que un árbol de la caché sea igual al de build_parse_tree.
+    """
+    span = node.get('span')
+    if span is not None:
+        node['span'] = tuple(span)
+    return node
+
+
+class ParseCache:
+    """
+    Caché de veredictos: LRU acotado por número de entradas y por bytes, con
+    una capa persistente opcional (SQLite) que sobrevive reinicios.
+    Cada entrada guarda solo (acepta, árbol serializado o None), nunca la tabla.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024,
+                 db_path: Optional[str] = None, commit_every: int = 100):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (acepta, árbol JSON, tamaño)
+        self.current_bytes = 0
+        self.commit_every = commit_every
+        self.pending_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, accepted INTEGER NOT NULL, tree TEXT)"
+            )
+            self.db.commit()
+
+    @staticmethod
+    def make_key(grammar_hash: str, words: Tuple[str, ...]) -> str:
+        """
+        Clave de la caché: hash de la gramática + tokens normalizados.
+        """
+        return grammar_hash + '\x1f' + '\x1f'.join(words)
+
+    def get(self, key: str, need_tree: bool = False) -> Optional[Tuple[bool, Optional[str]]]:
+        """
+        Busca una entrada en memoria y luego en disco. Retorna (acepta, árbol JSON) o None.
+        Con need_tree=True, una oración aceptada guardada sin árbol (por
+        recognize) cuenta como fallo: quien pregunta tendrá que parsearla.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            if need_tree and entry[0] and entry[1] is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT accepted, tree FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not (need_tree and row[0] and row[1] is None):
+                self.disk_hits += 1
+                self._store(key, bool(row[0]), row[1])
+                return bool(row[0]), row[1]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, accepted: bool, tree_json: Optional[str] = None):
+        """
+        Guarda un veredicto (y opcionalmente el árbol serializado).
+        """
+        self._store(key, accepted, tree_json)
+
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO results (key, accepted, tree) VALUES (?, ?, ?)",
+                (key, int(accepted), tree_json)
+            )
+            self.pending_writes += 1
+            if self.pending_writes >= self.commit_every:
+                self.flush()
+
+    def _store(self, key: str, accepted: bool, tree_json: Optional[str]):
+        """
+        Inserta en el LRU y expulsa las entradas más antiguas si se exceden los límites.
+        """
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[2]
+
+        size = ENTRY_OVERHEAD + len(key.encode('utf-8')) + (len(tree_json.encode('utf-8')) if tree_json else 0)
+        if size > self.max_bytes:
+            # Una entrada más grande que toda la caché no se guarda en memoria
+            return
+
+        self.entries[key] = (accepted, tree_json, size)
+        self.current_bytes += size
+
+        while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= evicted[2]
+            self.evictions += 1
+
+    def flush(self):
+        """
+        Confirma en disco las escrituras pendientes.
+        """
+        if self.db is not None and self.pending_writes:
+            self.db.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        """
+        Confirma las escrituras pendientes y cierra la base de datos.
+        """
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+    def clear(self):
+        """
+        Vacía la capa en memoria (la capa persistente se conserva).
+        """
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Métricas de la caché: aciertos, fallos, expulsiones y tasa de aciertos.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CachedParser:
+    """
+    Envuelve un CYKParser con un ParseCache delante de parse/recognize.
+    """
+
+    def __init__(self, parser: CYKParser, cache: Optional[ParseCache] = None, store_trees: bool = False):
+        self.parser = parser
+        self.cache = cache if cache is not None else ParseCache()
+        self.store_trees = store_trees
+        self.grammar_hash = grammar_fingerprint(parser)
+
+    def refresh_grammar(self):
+        """
+        Recalcula el hash tras cambiar la gramática del parser (las entradas
+        anteriores dejan de coincidir sin necesidad de vaciar la caché).
+        """
+        self.grammar_hash = grammar_fingerprint(self.parser)
+
+    def recognize(self, sentence: str) -> bool:
+        """
+        Decide si la oracion pertenece al lenguaje, usando la caché.
+        """
+        words = tuple(sentence.lower().split())
+        key = ParseCache.make_key(self.grammar_hash, words)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry[0]
+
+        accepted = self.parser.recognize(list(words))
+        self.cache.put(key, accepted)
+        return accepted
+
+    def parse(self, sentence: str) -> Tuple[bool, float, Optional[dict]]:
+        """
+        Como CYKParser.parse, pero el tercer valor es el árbol de parsing
+        (solo si store_trees=True) en lugar de la tabla CYK.
+
+        Retorna: (acepta: bool, tiempo: float, árbol: dict o None)
+        """
+        start_time = time.time()
+        words = tuple(sentence.lower().split())
+        key = ParseCache.make_key(self.grammar_hash, words)
+
+        entry = self.cache.get(key, need_tree=self.store_trees)
+        if entry is not None:
+            accepted, tree_json = entry
+            tree = json.loads(tree_json, object_hook=_restore_span) if tree_json else None
+            return accepted, time.time() - start_time, tree
+
+        accepted, _, parse_data = self.parser.parse(' '.join(words), verbose=False)
+        tree = None
+        tree_json = None
+        if self.store_trees and accepted:
+            tree = self.parser.build_parse_tree(parse_data)
+            tree_json = json.dumps(tree, ensure_ascii=False, separators=(',', ':'))
+        self.cache.put(key, accepted, tree_json)
+
+        return accepted, time.time() - start_time, tree
+
+    def recognize_many(self, sentences: List[str]) -> List[bool]:
+        """
+        Valida una lista de oraciones usando la caché.
+        """
+        return [self.recognize(sentence) for sentence in sentences]
@@ -0,0 +1,269 @@
+"""
+Proyecto 2 - Perfil de uso de reglas CNF
+Teoría de la Computación
+Cuenta, sobre un corpus completo, cuántas veces se aplica cada regla de la
+gramática en CNF y cuántas consultas (B, C) fallan, y usa ese perfil para
+reordenar (y opcionalmente podar) el índice del CYKParser al cargarlo.
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from itertools import chain, product, starmap
+from typing import Dict, Iterable, Tuple
+
+from cyk_parser import CYKParser
+
+
+class RuleProfile:
+    """
+    Contadores acumulados sobre un corpus para la gramática de un CYKParser:
+    aplicaciones de cada regla A -> B C (por par (B, C)) y A -> a (por palabra),
+    pares consultados sin regla y celdas pobladas por longitud de subcadena.
+    """
+
+    def __init__(self, parser: CYKParser):
+        self.parser = parser
+        self.sentences = 0
+        self.probes = Counter()  # (B, C) -> veces consultado en nonterminal_rules
+        self.word_hits = Counter()  # palabra -> veces que se aplicaron sus reglas A -> a
+        self.unknown_words = Counter()  # palabras sin regla terminal
+        self.cells = Counter()  # longitud -> celdas llenadas
+        self.populated = Counter()  # longitud -> celdas con al menos un no-terminal
+        self.symbols = Counter()  # longitud -> no-terminales en total
+
+    def record(self, sentence: str) -> bool:
+        """
+        Llena la tabla CYK de una oración con CYKParser.fill_table (el mismo
+        llenado de recognize) contando los pares (B, C) consultados, y acumula
+        las aplicaciones de cada regla. Retorna si la oración fue aceptada.
+        """
+        words = sentence.lower().split()
+        n = len(words)
+        if n == 0:
+            return False
+        self.sentences += 1
+
+        terminal_rules = self.parser.terminal_rules
+        table = [[None] * (n + 1) for _ in range(n)]
+        for i, word in enumerate(words):
+            heads = terminal_rules.get(word)
+            if heads:
+                self.word_hits[word] += 1
+            else:
+                self.unknown_words[word] += 1
+            table[i][1] = set(heads or ())
+
+        # Cada partición aporta el producto de sus celdas izquierda y derecha
+        probes = []
+        self.parser.fill_table(table, probes)
+        self.probes.update(chain.from_iterable(starmap(product, probes)))
+
+        for length in range(1, n + 1):
+            row = [table[i][length] for i in range(n - length + 1)]
+            self.cells[length] += len(row)
+            self.populated[length] += sum(1 for cell in row if cell)
+            self.symbols[length] += sum(len(cell) for cell in row)
+
+        return self.parser.start_symbol in table[0][n]
+
+    def record_corpus(self, sentences: Iterable[str]) -> dict:
+        """
+        Registra todas las oraciones (por ejemplo, las líneas de un archivo).
+        """
+        start_time = time.time()
+        count = 0
+        accepted = 0
+        for sentence in sentences:
+            if sentence.strip():
+                count += 1
+                accepted += self.record(sentence)
+        return {'sentences': count, 'accepted': accepted, 'elapsed': time.time() - start_time}
+
+    @property
+    def pair_hits(self) -> Counter:
+        """
+        (B, C) -> veces que se aplicaron sus reglas (pares consultados con regla).
+        """
+        nonterminal_rules = self.parser.nonterminal_rules
+        return Counter({pair: count for pair, count in self.probes.items() if nonterminal_rules.get(pair)})
+
+    @property
+    def pair_misses(self) -> Counter:
+        """
+        (B, C) -> veces consultado sin regla.
+        """
+        nonterminal_rules = self.parser.nonterminal_rules
+        return Counter({pair: count for pair, count in self.probes.items() if not nonterminal_rules.get(pair)})
+
+    def rule_hits(self) -> Dict[Tuple[str, Tuple[str, ...]], int]:
+        """
+        Aplicaciones de cada regla (A, símbolos) de la gramática cargada.
+        """
+        hits = {}
+        pair_hits = self.pair_hits
+        for left, prods in self.parser.grammar.items():
+            for symbols in prods:
+                if len(symbols) == 1:
+                    count = self.word_hits[symbols[0]]
+                elif len(symbols) == 2:
+                    count = pair_hits[(symbols[0], symbols[1])]
+                else:
+                    count = 0
+                hits[(left, tuple(symbols))] = count
+        return hits
+
+    def report(self, top: int = 10) -> dict:
+        """
+        Reglas más usadas, reglas que nunca se aplicaron, pares (B, C) que más
+        fallan y ocupación de las celdas por longitud de subcadena.
+        """
+        hits = self.rule_hits()
+        ranked = sorted(hits.items(), key=lambda item: -item[1])
+        return {
+            'sentences': self.sentences,
+            'rules': len(hits),
+            'hot_rules': [(f"{left} → {' '.join(symbols)}", count) for (left, symbols), count in ranked[:top] if count],
+            'dead_rules': [f"{left} → {' '.join(symbols)}" for (left, symbols), count in hits.items() if not count],
+            'missed_probes': [(f"{B} {C}", count) for (B, C), count in self.pair_misses.most_common(top)],
+            'unknown_words': [word for word, _ in self.unknown_words.most_common(top)],
+            'hot_cells': {
+                length: {
+                    'cells': self.cells[length],
+                    'populated': self.populated[length] / self.cells[length],
+                    'symbols': self.symbols[length] / self.cells[length]
+                }
+                for length in sorted(self.cells)
+            }
+        }
+
+    def save(self, filename: str):
+        """
+        Guarda los contadores en JSON para reutilizarlos al cargar la gramática.
+        """
+        data = {
+            'sentences': self.sentences,
+            'pair_hits': [[B, C, count] for (B, C), count in self.pair_hits.items()],
+            'pair_misses': [[B, C, count] for (B, C), count in self.pair_misses.items()],
+            'word_hits': dict(self.word_hits),
+            'unknown_words': dict(self.unknown_words),
+            'cells': [[length, self.cells[length], self.populated[length], self.symbols[length]]
+                      for length in sorted(self.cells)]
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename: str, parser: CYKParser) -> 'RuleProfile':
+        """
+        Carga un perfil guardado con save() para la gramática de `parser`.
+        """
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        profile = cls(parser)
+        profile.sentences = data['sentences']
+        profile.probes = Counter({(B, C): count for B, C, count in data['pair_hits'] + data['pair_misses']})
+        profile.word_hits = Counter(data['word_hits'])
+        profile.unknown_words = Counter(data['unknown_words'])
+        for length, cells, populated, symbols in data['cells']:
+            profile.cells[length] = cells
+            profile.populated[length] = populated
+            profile.symbols[length] = symbols
+        return profile
+
+
+def apply_profile(parser: CYKParser, profile: RuleProfile, prune: bool = False) -> dict:
+    """
+    Reconstruye el índice del parser guiado por el perfil: las reglas más usadas
+    quedan primero (y contiguas) en grammar, terminal_rules y nonterminal_rules,
+    y con prune=True se eliminan las que nunca se aplicaron en el corpus.
+
+    Podar no cambia ninguna tabla del corpus perfilado (esas reglas no aportaron
+    nada), pero sí puede rechazar oraciones nuevas que las necesiten.
+
+    Retorna: dict con reglas antes y después
+    """
+    hits = profile.rule_hits()
+    rules_before = len(hits)
+    order = {rule: index for index, rule in enumerate(hits)}
+
+    def rank(rule):
+        return (-hits[rule], order[rule])
+
+    kept = sorted((rule for rule, count in hits.items() if count or not prune), key=rank)
+
+    # No-terminales ordenados por su regla más usada (el inicial siempre primero)
+    grammar = {}
+    for left, symbols in sorted(kept, key=lambda rule: (rule[0] != parser.start_symbol, rank(rule))):
+        grammar.setdefault(left, [])
+    terminal_rules = {}
+    nonterminal_rules = {}
+    for left, symbols in kept:
+        grammar[left].append(list(symbols))
+        if len(symbols) == 1:
+            terminal_rules.setdefault(symbols[0], []).append(left)
+        elif len(symbols) == 2:
+            nonterminal_rules.setdefault(symbols, []).append(left)
+
+    parser.load_compiled({
+        'grammar': grammar,
+        'terminal_rules': terminal_rules,
+        'nonterminal_rules': nonterminal_rules,
+        'start_symbol': parser.start_symbol
+    })
+    return {'rules_before': rules_before, 'rules_after': len(kept), 'pruned': rules_before - len(kept)}
+
+
+def print_report(report: dict):
+    """
+    Muestra el reporte de RuleProfile.report() en consola.
+    """
+    print(f"\n{'='*60}")
+    print(f"PERFIL DE REGLAS ({report['sentences']} oraciones, {report['rules']} reglas)")
+    print('='*60)
+    print("Reglas más usadas:")
+    for rule, count in report['hot_rules']:
+        print(f"  {count:>10}  {rule}")
+    print(f"Reglas nunca aplicadas: {len(report['dead_rules'])}")
+    for rule in report['dead_rules'][:10]:
+        print(f"  {rule}")
+    print("Pares (B, C) consultados sin regla:")
+    for pair, count in report['missed_probes']:
+        print(f"  {count:>10}  {pair}")
+    if report['unknown_words']:
+        print(f"Palabras desconocidas: {', '.join(report['unknown_words'])}")
+    print("Celdas por longitud (pobladas, no-terminales por celda):")
+    for length, stats in report['hot_cells'].items():
+        print(f"  {length:>3}: {stats['cells']:>8} celdas  {stats['populated']:6.1%}  {stats['symbols']:.2f}")
+    print('='*60)
+
+
+def main():
+    """
+    Uso: python rule_profiler.py gramatica_cnf.txt corpus.txt [-o perfil.json] [--top N]
+    """
+    arg_parser = argparse.ArgumentParser(description="Perfil de uso de reglas CNF sobre un corpus")
+    arg_parser.add_argument('grammar', help="Gramática en CNF")
+    arg_parser.add_argument('corpus', help="Archivo con una oración por línea")
+    arg_parser.add_argument('-o', '--output', default=None, help="Guardar el perfil en JSON")
+    arg_parser.add_argument('--top', type=int, default=10, help="Reglas y pares a mostrar")
+    args = arg_parser.parse_args()
+
+    parser = CYKParser()
+    if not parser.load_cnf_grammar(args.grammar):
+        return
+
+    profile = RuleProfile(parser)
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        summary = profile.record_corpus(f)
+    print(f"✓ {summary['sentences']} oraciones ({summary['accepted']} aceptadas) en {summary['elapsed']:.2f} s")
+    print_report(profile.report(args.top))
+
+    if args.output:
+        profile.save(args.output)
+        print(f"  Perfil guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()